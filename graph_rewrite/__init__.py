@@ -1,5 +1,6 @@
 __version__ = "0.0.1"
 
-from .transform import rewrite,rewrite_iter
-from .core import draw
-from .match_class import draw_match,Match
\ No newline at end of file
+from .transform import rewrite,rewrite_iter,rewrite_many
+from .core import draw,RewriteStats
+from .match_class import draw_match,Match
+from .matcher import AttributeIndex,GraphStatistics,plan_matching
\ No newline at end of file
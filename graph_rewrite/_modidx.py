@@ -5,10 +5,72 @@ d = { 'settings': { 'branch': 'main',
                 'doc_host': 'https://DeanLight.github.io',
                 'git_url': 'https://github.com/DeanLight/graph_rewrite',
                 'lib_path': 'graph_rewrite'},
-  'syms': { 'graph_rewrite.core': { 'graph_rewrite.core.GraphRewriteException': ( 'core.html#graphrewriteexception',
+  'syms': { 'graph_rewrite.benchmarks': { 'graph_rewrite.benchmarks.Benchmark': ( 'benchmarks.html#benchmark',
+                                                                                  'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks.PatternSpec': ( 'benchmarks.html#patternspec',
+                                                                                    'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks._environment': ( 'benchmarks.html#_environment',
+                                                                                     'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks._find_matches_benchmarks': ( 'benchmarks.html#_find_matches_benchmarks',
+                                                                                                 'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks._generated_graph': ( 'benchmarks.html#_generated_graph',
+                                                                                         'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks._import_benchmarks': ( 'benchmarks.html#_import_benchmarks',
+                                                                                           'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks._parse_benchmarks': ( 'benchmarks.html#_parse_benchmarks',
+                                                                                          'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks._primitive_benchmarks': ( 'benchmarks.html#_primitive_benchmarks',
+                                                                                              'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks._rewrite_benchmarks': ( 'benchmarks.html#_rewrite_benchmarks',
+                                                                                            'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks._rule_benchmarks': ( 'benchmarks.html#_rule_benchmarks',
+                                                                                         'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks._run_python': ( 'benchmarks.html#_run_python',
+                                                                                    'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks._sum_of_vals': ( 'benchmarks.html#_sum_of_vals',
+                                                                                     'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks._with_attrs': ( 'benchmarks.html#_with_attrs',
+                                                                                    'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks.all_benchmarks': ( 'benchmarks.html#all_benchmarks',
+                                                                                       'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks.benchmark': ( 'benchmarks.html#benchmark',
+                                                                                  'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks.chain': ('benchmarks.html#chain', 'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks.compare_results': ( 'benchmarks.html#compare_results',
+                                                                                        'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks.grid': ('benchmarks.html#grid', 'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks.random_dag': ( 'benchmarks.html#random_dag',
+                                                                                   'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks.run_benchmarks': ( 'benchmarks.html#run_benchmarks',
+                                                                                       'graph_rewrite/benchmarks.py'),
+                                          'graph_rewrite.benchmarks.scale_free': ( 'benchmarks.html#scale_free',
+                                                                                   'graph_rewrite/benchmarks.py')},
+            'graph_rewrite.core': { 'graph_rewrite.core.CacheInfo': ('core.html#cacheinfo', 'graph_rewrite/core.py'),
+                                    'graph_rewrite.core.GraphRewriteException': ( 'core.html#graphrewriteexception',
                                                                                   'graph_rewrite/core.py'),
                                     'graph_rewrite.core.GraphRewriteException.__init__': ( 'core.html#graphrewriteexception.__init__',
                                                                                            'graph_rewrite/core.py'),
+                                    'graph_rewrite.core.PatternCache': ('core.html#patterncache', 'graph_rewrite/core.py'),
+                                    'graph_rewrite.core.PatternCache.__init__': ( 'core.html#patterncache.__init__',
+                                                                                  'graph_rewrite/core.py'),
+                                    'graph_rewrite.core.PatternCache.clear': ('core.html#patterncache.clear', 'graph_rewrite/core.py'),
+                                    'graph_rewrite.core.PatternCache.get': ('core.html#patterncache.get', 'graph_rewrite/core.py'),
+                                    'graph_rewrite.core.PatternCache.info': ('core.html#patterncache.info', 'graph_rewrite/core.py'),
+                                    'graph_rewrite.core.RewriteStats': ('core.html#rewritestats', 'graph_rewrite/core.py'),
+                                    'graph_rewrite.core.RewriteStats.__init__': ( 'core.html#rewritestats.__init__',
+                                                                                  'graph_rewrite/core.py'),
+                                    'graph_rewrite.core.RewriteStats.__repr__': ( 'core.html#rewritestats.__repr__',
+                                                                                  'graph_rewrite/core.py'),
+                                    'graph_rewrite.core.RewriteStats._stop_current': ( 'core.html#rewritestats._stop_current',
+                                                                                       'graph_rewrite/core.py'),
+                                    'graph_rewrite.core.RewriteStats.as_dict': ('core.html#rewritestats.as_dict', 'graph_rewrite/core.py'),
+                                    'graph_rewrite.core.RewriteStats.count': ('core.html#rewritestats.count', 'graph_rewrite/core.py'),
+                                    'graph_rewrite.core.RewriteStats.merge': ('core.html#rewritestats.merge', 'graph_rewrite/core.py'),
+                                    'graph_rewrite.core.RewriteStats.phase': ('core.html#rewritestats.phase', 'graph_rewrite/core.py'),
+                                    'graph_rewrite.core.RewriteStats.timed_func': ( 'core.html#rewritestats.timed_func',
+                                                                                    'graph_rewrite/core.py'),
+                                    'graph_rewrite.core.RewriteStats.timed_iter': ( 'core.html#rewritestats.timed_iter',
+                                                                                    'graph_rewrite/core.py'),
                                     'graph_rewrite.core._create_graph': ('core.html#_create_graph', 'graph_rewrite/core.py'),
                                     'graph_rewrite.core._escaped_html_format': ('core.html#_escaped_html_format', 'graph_rewrite/core.py'),
                                     'graph_rewrite.core._get_edge_description': ( 'core.html#_get_edge_description',
@@ -16,6 +78,7 @@ d = { 'settings': { 'branch': 'main',
                                     'graph_rewrite.core._get_node_description': ( 'core.html#_get_node_description',
                                                                                   'graph_rewrite/core.py'),
                                     'graph_rewrite.core._graphs_equal': ('core.html#_graphs_equal', 'graph_rewrite/core.py'),
+                                    'graph_rewrite.core._phase': ('core.html#_phase', 'graph_rewrite/core.py'),
                                     'graph_rewrite.core._plot_graph': ('core.html#_plot_graph', 'graph_rewrite/core.py'),
                                     'graph_rewrite.core.draw': ('core.html#draw', 'graph_rewrite/core.py'),
                                     'graph_rewrite.core.mm': ('core.html#mm', 'graph_rewrite/core.py'),
@@ -26,7 +89,39 @@ d = { 'settings': { 'branch': 'main',
                                     'graph_rewrite.core.render_jinja': ('core.html#render_jinja', 'graph_rewrite/core.py'),
                                     'graph_rewrite.core.template_undeclared_vars': ( 'core.html#template_undeclared_vars',
                                                                                      'graph_rewrite/core.py')},
-            'graph_rewrite.lhs': { 'graph_rewrite.lhs.graphRewriteTransformer': ( 'lhs_parsing.html#graphrewritetransformer',
+            'graph_rewrite.fast_parse': { 'graph_rewrite.fast_parse._NotSimple': ( 'fast_parse.html#_notsimple',
+                                                                                   'graph_rewrite/fast_parse.py'),
+                                          'graph_rewrite.fast_parse._SimpleParser': ( 'fast_parse.html#_simpleparser',
+                                                                                      'graph_rewrite/fast_parse.py'),
+                                          'graph_rewrite.fast_parse._SimpleParser.__init__': ( 'fast_parse.html#_simpleparser.__init__',
+                                                                                               'graph_rewrite/fast_parse.py'),
+                                          'graph_rewrite.fast_parse._SimpleParser._attribute': ( 'fast_parse.html#_simpleparser._attribute',
+                                                                                                 'graph_rewrite/fast_parse.py'),
+                                          'graph_rewrite.fast_parse._SimpleParser._attributes': ( 'fast_parse.html#_simpleparser._attributes',
+                                                                                                  'graph_rewrite/fast_parse.py'),
+                                          'graph_rewrite.fast_parse._SimpleParser._pattern': ( 'fast_parse.html#_simpleparser._pattern',
+                                                                                               'graph_rewrite/fast_parse.py'),
+                                          'graph_rewrite.fast_parse._SimpleParser._peek': ( 'fast_parse.html#_simpleparser._peek',
+                                                                                            'graph_rewrite/fast_parse.py'),
+                                          'graph_rewrite.fast_parse._SimpleParser._take': ( 'fast_parse.html#_simpleparser._take',
+                                                                                            'graph_rewrite/fast_parse.py'),
+                                          'graph_rewrite.fast_parse._SimpleParser._token': ( 'fast_parse.html#_simpleparser._token',
+                                                                                             'graph_rewrite/fast_parse.py'),
+                                          'graph_rewrite.fast_parse._SimpleParser._vertex': ( 'fast_parse.html#_simpleparser._vertex',
+                                                                                              'graph_rewrite/fast_parse.py'),
+                                          'graph_rewrite.fast_parse._SimpleParser.patterns': ( 'fast_parse.html#_simpleparser.patterns',
+                                                                                               'graph_rewrite/fast_parse.py'),
+                                          'graph_rewrite.fast_parse._parse_simple': ( 'fast_parse.html#_parse_simple',
+                                                                                      'graph_rewrite/fast_parse.py')},
+            'graph_rewrite.lhs': { 'graph_rewrite.lhs.__getattr__': ('lhs_parsing.html#__getattr__', 'graph_rewrite/lhs.py'),
+                                   'graph_rewrite.lhs._compile_constraints': ( 'lhs_parsing.html#_compile_constraints',
+                                                                               'graph_rewrite/lhs.py'),
+                                   'graph_rewrite.lhs._has_type': ('lhs_parsing.html#_has_type', 'graph_rewrite/lhs.py'),
+                                   'graph_rewrite.lhs._lhs_parser': ('lhs_parsing.html#_lhs_parser', 'graph_rewrite/lhs.py'),
+                                   'graph_rewrite.lhs._match_satisfies': ('lhs_parsing.html#_match_satisfies', 'graph_rewrite/lhs.py'),
+                                   'graph_rewrite.lhs._parse_lhs': ('lhs_parsing.html#_parse_lhs', 'graph_rewrite/lhs.py'),
+                                   'graph_rewrite.lhs._type_condition': ('lhs_parsing.html#_type_condition', 'graph_rewrite/lhs.py'),
+                                   'graph_rewrite.lhs.graphRewriteTransformer': ( 'lhs_parsing.html#graphrewritetransformer',
                                                                                   'graph_rewrite/lhs.py'),
                                    'graph_rewrite.lhs.graphRewriteTransformer.ANONYMUS': ( 'lhs_parsing.html#graphrewritetransformer.anonymus',
                                                                                            'graph_rewrite/lhs.py'),
@@ -82,6 +177,8 @@ d = { 'settings': { 'branch': 'main',
                                                                                         'graph_rewrite/match_class.py'),
                                            'graph_rewrite.match_class.Match.edges': ( 'match_class.html#match.edges',
                                                                                       'graph_rewrite/match_class.py'),
+                                           'graph_rewrite.match_class.Match.key': ( 'match_class.html#match.key',
+                                                                                    'graph_rewrite/match_class.py'),
                                            'graph_rewrite.match_class.Match.nodes': ( 'match_class.html#match.nodes',
                                                                                       'graph_rewrite/match_class.py'),
                                            'graph_rewrite.match_class.Match.set_graph': ( 'match_class.html#match.set_graph',
@@ -94,21 +191,149 @@ d = { 'settings': { 'branch': 'main',
                                                                                             'graph_rewrite/match_class.py'),
                                            'graph_rewrite.match_class.mapping_to_match': ( 'match_class.html#mapping_to_match',
                                                                                            'graph_rewrite/match_class.py')},
-            'graph_rewrite.matcher': { 'graph_rewrite.matcher._attributes_exist': ( 'matcher.html#_attributes_exist',
+            'graph_rewrite.matcher': { 'graph_rewrite.matcher.AttributeIndex': ('matcher.html#attributeindex', 'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.AttributeIndex.__init__': ( 'matcher.html#attributeindex.__init__',
+                                                                                          'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.AttributeIndex._index_edge': ( 'matcher.html#attributeindex._index_edge',
+                                                                                             'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.AttributeIndex._index_node': ( 'matcher.html#attributeindex._index_node',
+                                                                                             'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.AttributeIndex._keys': ( 'matcher.html#attributeindex._keys',
+                                                                                       'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.AttributeIndex._unindex': ( 'matcher.html#attributeindex._unindex',
+                                                                                          'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.AttributeIndex.edges_with': ( 'matcher.html#attributeindex.edges_with',
+                                                                                            'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.AttributeIndex.nodes_with': ( 'matcher.html#attributeindex.nodes_with',
+                                                                                            'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.AttributeIndex.refresh': ( 'matcher.html#attributeindex.refresh',
+                                                                                         'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.GraphStatistics': ( 'matcher.html#graphstatistics',
+                                                                                  'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.GraphStatistics.__init__': ( 'matcher.html#graphstatistics.__init__',
+                                                                                           'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.GraphStatistics._at_least': ( 'matcher.html#graphstatistics._at_least',
+                                                                                            'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.GraphStatistics._fraction': ( 'matcher.html#graphstatistics._fraction',
+                                                                                            'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.GraphStatistics._histograms': ( 'matcher.html#graphstatistics._histograms',
+                                                                                              'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.GraphStatistics.degree_fraction': ( 'matcher.html#graphstatistics.degree_fraction',
+                                                                                                  'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.GraphStatistics.edge_fraction': ( 'matcher.html#graphstatistics.edge_fraction',
+                                                                                                'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.GraphStatistics.node_fraction': ( 'matcher.html#graphstatistics.node_fraction',
+                                                                                                'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.MatchPlan': ('matcher.html#matchplan', 'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.MatchPlan.__str__': ( 'matcher.html#matchplan.__str__',
+                                                                                    'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.MatchPlan.cost': ('matcher.html#matchplan.cost', 'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.MatchPlan.explain': ( 'matcher.html#matchplan.explain',
                                                                                     'graph_rewrite/matcher.py'),
-                                       'graph_rewrite.matcher._does_isom_match_pattern': ( 'matcher.html#_does_isom_match_pattern',
+                                       'graph_rewrite.matcher.MatchPlan.order': ( 'matcher.html#matchplan.order',
+                                                                                  'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.PlanStep': ('matcher.html#planstep', 'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._CompactGraph': ('matcher.html#_compactgraph', 'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._CompactGraph.__init__': ( 'matcher.html#_compactgraph.__init__',
+                                                                                         'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._CompactGraph._csr': ( 'matcher.html#_compactgraph._csr',
+                                                                                     'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._CompactGraph.attrs_mask': ( 'matcher.html#_compactgraph.attrs_mask',
                                                                                            'graph_rewrite/matcher.py'),
-                                       'graph_rewrite.matcher._does_node_match_pattern': ( 'matcher.html#_does_node_match_pattern',
+                                       'graph_rewrite.matcher._CompactGraph.has_edge': ( 'matcher.html#_compactgraph.has_edge',
+                                                                                         'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._CompactGraph.of': ( 'matcher.html#_compactgraph.of',
+                                                                                   'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._Histogram': ('matcher.html#_histogram', 'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._MatchPool': ('matcher.html#_matchpool', 'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._MatchPool.__init__': ( 'matcher.html#_matchpool.__init__',
+                                                                                      'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._MatchPool.__len__': ( 'matcher.html#_matchpool.__len__',
+                                                                                     'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._MatchPool._add_matches': ( 'matcher.html#_matchpool._add_matches',
+                                                                                          'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._MatchPool._remove_match': ( 'matcher.html#_matchpool._remove_match',
                                                                                            'graph_rewrite/matcher.py'),
-                                       'graph_rewrite.matcher._find_structural_matches': ( 'matcher.html#_find_structural_matches',
+                                       'graph_rewrite.matcher._MatchPool._search': ( 'matcher.html#_matchpool._search',
+                                                                                     'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._MatchPool.first': ( 'matcher.html#_matchpool.first',
+                                                                                   'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._MatchPool.update': ( 'matcher.html#_matchpool.update',
+                                                                                    'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._are_twins': ('matcher.html#_are_twins', 'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._attributes_exist': ( 'matcher.html#_attributes_exist',
+                                                                                    'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._checks_constraints_only': ( 'matcher.html#_checks_constraints_only',
                                                                                            'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._component_pattern': ( 'matcher.html#_component_pattern',
+                                                                                     'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._constraints_of': ( 'matcher.html#_constraints_of',
+                                                                                  'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._disjoint_matches': ( 'matcher.html#_disjoint_matches',
+                                                                                    'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._existential_order': ( 'matcher.html#_existential_order',
+                                                                                     'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._find_mappings': ('matcher.html#_find_mappings', 'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._find_mappings_compact': ( 'matcher.html#_find_mappings_compact',
+                                                                                         'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._find_mappings_in_workers': ( 'matcher.html#_find_mappings_in_workers',
+                                                                                            'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._first_injective': ( 'matcher.html#_first_injective',
+                                                                                   'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._index_candidates': ( 'matcher.html#_index_candidates',
+                                                                                    'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._init_search_worker': ( 'matcher.html#_init_search_worker',
+                                                                                      'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._instrument_mappings': ( 'matcher.html#_instrument_mappings',
+                                                                                       'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._instrument_search': ( 'matcher.html#_instrument_search',
+                                                                                     'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._is_hashable': ('matcher.html#_is_hashable', 'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._join_mappings': ('matcher.html#_join_mappings', 'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._match_order': ('matcher.html#_match_order', 'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._matches_with_nodes': ( 'matcher.html#_matches_with_nodes',
+                                                                                      'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._pattern_predicates': ( 'matcher.html#_pattern_predicates',
+                                                                                      'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._plan_from': ('matcher.html#_plan_from', 'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._precedes': ('matcher.html#_precedes', 'graph_rewrite/matcher.py'),
                                        'graph_rewrite.matcher._remove_duplicated_matches': ( 'matcher.html#_remove_duplicated_matches',
                                                                                              'graph_rewrite/matcher.py'),
-                                       'graph_rewrite.matcher.find_matches': ('matcher.html#find_matches', 'graph_rewrite/matcher.py')},
-            'graph_rewrite.p_rhs_parse': { 'graph_rewrite.p_rhs_parse.p_to_graph': ( 'p_rhs_parsing.html#p_to_graph',
+                                       'graph_rewrite.matcher._search_anchored': ( 'matcher.html#_search_anchored',
+                                                                                   'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._search_mappings': ( 'matcher.html#_search_mappings',
+                                                                                   'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._search_plan': ('matcher.html#_search_plan', 'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._twin_bounds': ('matcher.html#_twin_bounds', 'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher._twin_classes': ('matcher.html#_twin_classes', 'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.find_matches': ('matcher.html#find_matches', 'graph_rewrite/matcher.py'),
+                                       'graph_rewrite.matcher.plan_matching': ('matcher.html#plan_matching', 'graph_rewrite/matcher.py')},
+            'graph_rewrite.p_rhs_parse': { 'graph_rewrite.p_rhs_parse._Placeholder': ( 'p_rhs_parsing.html#_placeholder',
+                                                                                       'graph_rewrite/p_rhs_parse.py'),
+                                           'graph_rewrite.p_rhs_parse.__getattr__': ( 'p_rhs_parsing.html#__getattr__',
+                                                                                      'graph_rewrite/p_rhs_parse.py'),
+                                           'graph_rewrite.p_rhs_parse._cached_rhs_template': ( 'p_rhs_parsing.html#_cached_rhs_template',
+                                                                                               'graph_rewrite/p_rhs_parse.py'),
+                                           'graph_rewrite.p_rhs_parse._p_parser': ( 'p_rhs_parsing.html#_p_parser',
+                                                                                    'graph_rewrite/p_rhs_parse.py'),
+                                           'graph_rewrite.p_rhs_parse._parse_p': ( 'p_rhs_parsing.html#_parse_p',
+                                                                                   'graph_rewrite/p_rhs_parse.py'),
+                                           'graph_rewrite.p_rhs_parse._parse_rhs_template': ( 'p_rhs_parsing.html#_parse_rhs_template',
+                                                                                              'graph_rewrite/p_rhs_parse.py'),
+                                           'graph_rewrite.p_rhs_parse._rhs_parser': ( 'p_rhs_parsing.html#_rhs_parser',
+                                                                                      'graph_rewrite/p_rhs_parse.py'),
+                                           'graph_rewrite.p_rhs_parse._templateTransformer': ( 'p_rhs_parsing.html#_templatetransformer',
+                                                                                               'graph_rewrite/p_rhs_parse.py'),
+                                           'graph_rewrite.p_rhs_parse._templateTransformer.USER_VALUE': ( 'p_rhs_parsing.html#_templatetransformer.user_value',
+                                                                                                          'graph_rewrite/p_rhs_parse.py'),
+                                           'graph_rewrite.p_rhs_parse.p_to_graph': ( 'p_rhs_parsing.html#p_to_graph',
                                                                                      'graph_rewrite/p_rhs_parse.py'),
+                                           'graph_rewrite.p_rhs_parse.render_rhs_template': ( 'p_rhs_parsing.html#render_rhs_template',
+                                                                                              'graph_rewrite/p_rhs_parse.py'),
                                            'graph_rewrite.p_rhs_parse.rhs_to_graph': ( 'p_rhs_parsing.html#rhs_to_graph',
-                                                                                       'graph_rewrite/p_rhs_parse.py')},
+                                                                                       'graph_rewrite/p_rhs_parse.py'),
+                                           'graph_rewrite.p_rhs_parse.rhs_to_template': ( 'p_rhs_parsing.html#rhs_to_template',
+                                                                                          'graph_rewrite/p_rhs_parse.py')},
             'graph_rewrite.rules': { 'graph_rewrite.rules.MergePolicy': ('rules.html#mergepolicy', 'graph_rewrite/rules.py'),
                                      'graph_rewrite.rules.MergePolicy._merge_dicts': ( 'rules.html#mergepolicy._merge_dicts',
                                                                                        'graph_rewrite/rules.py'),
@@ -135,6 +360,7 @@ d = { 'settings': { 'branch': 'main',
                                                                                    'graph_rewrite/rules.py'),
                                      'graph_rewrite.rules.Rule._validate_rule': ( 'rules.html#rule._validate_rule',
                                                                                   'graph_rewrite/rules.py'),
+                                     'graph_rewrite.rules.Rule._with_rhs': ('rules.html#rule._with_rhs', 'graph_rewrite/rules.py'),
                                      'graph_rewrite.rules.Rule.edge_attrs_to_add': ( 'rules.html#rule.edge_attrs_to_add',
                                                                                      'graph_rewrite/rules.py'),
                                      'graph_rewrite.rules.Rule.edge_attrs_to_remove': ( 'rules.html#rule.edge_attrs_to_remove',
@@ -152,8 +378,22 @@ d = { 'settings': { 'branch': 'main',
                                      'graph_rewrite.rules.Rule.nodes_to_merge': ( 'rules.html#rule.nodes_to_merge',
                                                                                   'graph_rewrite/rules.py'),
                                      'graph_rewrite.rules.Rule.nodes_to_remove': ( 'rules.html#rule.nodes_to_remove',
-                                                                                   'graph_rewrite/rules.py')},
-            'graph_rewrite.transform': { 'graph_rewrite.transform._add_edge': ('transform.html#_add_edge', 'graph_rewrite/transform.py'),
+                                                                                   'graph_rewrite/rules.py'),
+                                     'graph_rewrite.rules._cached_operation': ('rules.html#_cached_operation', 'graph_rewrite/rules.py')},
+            'graph_rewrite.transform': { 'graph_rewrite.transform._CompiledRewrite': ( 'transform.html#_compiledrewrite',
+                                                                                       'graph_rewrite/transform.py'),
+                                         'graph_rewrite.transform._UndoLog': ('transform.html#_undolog', 'graph_rewrite/transform.py'),
+                                         'graph_rewrite.transform._UndoLog.__init__': ( 'transform.html#_undolog.__init__',
+                                                                                        'graph_rewrite/transform.py'),
+                                         'graph_rewrite.transform._UndoLog.__len__': ( 'transform.html#_undolog.__len__',
+                                                                                       'graph_rewrite/transform.py'),
+                                         'graph_rewrite.transform._UndoLog.record': ( 'transform.html#_undolog.record',
+                                                                                      'graph_rewrite/transform.py'),
+                                         'graph_rewrite.transform._UndoLog.rollback': ( 'transform.html#_undolog.rollback',
+                                                                                        'graph_rewrite/transform.py'),
+                                         'graph_rewrite.transform._UndoLog.touch': ( 'transform.html#_undolog.touch',
+                                                                                     'graph_rewrite/transform.py'),
+                                         'graph_rewrite.transform._add_edge': ('transform.html#_add_edge', 'graph_rewrite/transform.py'),
                                          'graph_rewrite.transform._add_edge_attrs': ( 'transform.html#_add_edge_attrs',
                                                                                       'graph_rewrite/transform.py'),
                                          'graph_rewrite.transform._add_node': ('transform.html#_add_node', 'graph_rewrite/transform.py'),
@@ -161,10 +401,18 @@ d = { 'settings': { 'branch': 'main',
                                                                                       'graph_rewrite/transform.py'),
                                          'graph_rewrite.transform._clone_node': ( 'transform.html#_clone_node',
                                                                                   'graph_rewrite/transform.py'),
+                                         'graph_rewrite.transform._compile_rewrite': ( 'transform.html#_compile_rewrite',
+                                                                                       'graph_rewrite/transform.py'),
+                                         'graph_rewrite.transform._compile_rule': ( 'transform.html#_compile_rule',
+                                                                                    'graph_rewrite/transform.py'),
                                          'graph_rewrite.transform._copy_graph': ( 'transform.html#_copy_graph',
                                                                                   'graph_rewrite/transform.py'),
                                          'graph_rewrite.transform._generate_new_node_name': ( 'transform.html#_generate_new_node_name',
                                                                                               'graph_rewrite/transform.py'),
+                                         'graph_rewrite.transform._init_many_worker': ( 'transform.html#_init_many_worker',
+                                                                                        'graph_rewrite/transform.py'),
+                                         'graph_rewrite.transform._init_shard_worker': ( 'transform.html#_init_shard_worker',
+                                                                                         'graph_rewrite/transform.py'),
                                          'graph_rewrite.transform._log': ('transform.html#_log', 'graph_rewrite/transform.py'),
                                          'graph_rewrite.transform._merge_nodes': ( 'transform.html#_merge_nodes',
                                                                                    'graph_rewrite/transform.py'),
@@ -176,16 +424,30 @@ d = { 'settings': { 'branch': 'main',
                                                                                    'graph_rewrite/transform.py'),
                                          'graph_rewrite.transform._remove_node_attrs': ( 'transform.html#_remove_node_attrs',
                                                                                          'graph_rewrite/transform.py'),
-                                         'graph_rewrite.transform._restore_graph': ( 'transform.html#_restore_graph',
+                                         'graph_rewrite.transform._restore_attrs': ( 'transform.html#_restore_attrs',
+                                                                                     'graph_rewrite/transform.py'),
+                                         'graph_rewrite.transform._restore_node': ( 'transform.html#_restore_node',
+                                                                                    'graph_rewrite/transform.py'),
+                                         'graph_rewrite.transform._rewrite_chunk': ( 'transform.html#_rewrite_chunk',
                                                                                      'graph_rewrite/transform.py'),
+                                         'graph_rewrite.transform._rewrite_compiled': ( 'transform.html#_rewrite_compiled',
+                                                                                        'graph_rewrite/transform.py'),
+                                         'graph_rewrite.transform._rewrite_components': ( 'transform.html#_rewrite_components',
+                                                                                          'graph_rewrite/transform.py'),
                                          'graph_rewrite.transform._rewrite_match': ( 'transform.html#_rewrite_match',
                                                                                      'graph_rewrite/transform.py'),
                                          'graph_rewrite.transform._rewrite_match_expansive': ( 'transform.html#_rewrite_match_expansive',
                                                                                                'graph_rewrite/transform.py'),
                                          'graph_rewrite.transform._rewrite_match_restrictive': ( 'transform.html#_rewrite_match_restrictive',
                                                                                                  'graph_rewrite/transform.py'),
+                                         'graph_rewrite.transform._rewrite_sharded': ( 'transform.html#_rewrite_sharded',
+                                                                                       'graph_rewrite/transform.py'),
                                          'graph_rewrite.transform._setup_merged_node': ( 'transform.html#_setup_merged_node',
                                                                                          'graph_rewrite/transform.py'),
+                                         'graph_rewrite.transform._stitch_components': ( 'transform.html#_stitch_components',
+                                                                                         'graph_rewrite/transform.py'),
                                          'graph_rewrite.transform.rewrite': ('transform.html#rewrite', 'graph_rewrite/transform.py'),
                                          'graph_rewrite.transform.rewrite_iter': ( 'transform.html#rewrite_iter',
+                                                                                   'graph_rewrite/transform.py'),
+                                         'graph_rewrite.transform.rewrite_many': ( 'transform.html#rewrite_many',
                                                                                    'graph_rewrite/transform.py')}}}
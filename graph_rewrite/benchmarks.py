@@ -0,0 +1,306 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/07_benchmarks.ipynb.
+
+# %% auto 0
+__all__ = ['GENERATORS', 'PATTERNS', 'VISUALIZATION_MODULES', 'random_dag', 'scale_free', 'grid', 'chain', 'PatternSpec',
+           'Benchmark', 'all_benchmarks', 'run_benchmarks', 'compare_results', 'benchmark']
+
+# %% ../nbs/07_benchmarks.ipynb 5
+import os
+import re
+import sys
+import json
+import time
+import random
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from functools import lru_cache
+from math import ceil, sqrt
+from pathlib import Path
+from typing import *
+import networkx as nx
+from networkx import DiGraph
+from fastcore.script import call_parse
+
+import graph_rewrite
+from .core import pattern_cache
+from .lhs import lhs_to_graph
+from .p_rhs_parse import p_to_graph, rhs_to_graph
+from .rules import Rule, MergePolicy
+from .matcher import find_matches, AttributeIndex
+from .transform import rewrite, _UndoLog, _clone_node, _remove_node, _remove_edge, _remove_node_attrs, \
+    _remove_edge_attrs, _merge_nodes, _add_node, _add_edge, _add_node_attrs, _add_edge_attrs
+
+# %% ../nbs/07_benchmarks.ipynb 7
+def _with_attrs(graph: DiGraph, seed: int) -> DiGraph:
+    # Node names are strings (as in parsed patterns), and every node and edge carries the same attribute names
+    graph = nx.relabel_nodes(graph, {node: str(i) for i, node in enumerate(graph.nodes)})
+    rng = random.Random(seed)
+    for node, attrs in graph.nodes(data=True):
+        attrs.update(val=rng.randrange(100), type=rng.choice('xyz'))
+    for _, _, attrs in graph.edges(data=True):
+        attrs.update(weight=rng.random())
+    return graph
+
+def random_dag(size: int, seed: int = 0, out_degree: int = 3) -> DiGraph:
+    """A random DAG, in which every node points to (up to) `out_degree` random nodes that come after it."""
+    rng = random.Random(seed)
+    graph = DiGraph()
+    graph.add_nodes_from(range(size))
+    for node in range(size - 1):
+        targets = rng.sample(range(node + 1, size), min(out_degree, size - node - 1))
+        graph.add_edges_from((node, target) for target in targets)
+    return _with_attrs(graph, seed)
+
+def scale_free(size: int, seed: int = 0) -> DiGraph:
+    """A scale-free graph (a few hubs with many neighbours), without parallel edges and self loops."""
+    graph = DiGraph(nx.scale_free_graph(size, seed=seed))
+    graph.remove_edges_from(list(nx.selfloop_edges(graph)))
+    return _with_attrs(graph, seed)
+
+def grid(size: int, seed: int = 0) -> DiGraph:
+    """A square grid, with edges pointing right and down."""
+    side = ceil(sqrt(size))
+    graph = DiGraph()
+    graph.add_nodes_from((row, col) for row in range(side) for col in range(side))
+    graph.add_edges_from(((row, col), (row, col + 1)) for row in range(side) for col in range(side - 1))
+    graph.add_edges_from(((row, col), (row + 1, col)) for row in range(side - 1) for col in range(side))
+    return _with_attrs(graph, seed)
+
+def chain(size: int, seed: int = 0) -> DiGraph:
+    """A single directed path."""
+    return _with_attrs(nx.path_graph(size, create_using=DiGraph), seed)
+
+GENERATORS: dict[str, Callable[[int, int], DiGraph]] = {
+    "random_dag": random_dag,
+    "scale_free": scale_free,
+    "grid": grid,
+    "chain": chain,
+}
+
+@lru_cache(maxsize=32)
+def _generated_graph(generator: str, size: int, seed: int) -> DiGraph:
+    # Each benchmark gets a copy, so a graph is generated only once per (generator, size, seed)
+    return GENERATORS[generator](size, seed)
+
+# %% ../nbs/07_benchmarks.ipynb 10
+def _sum_of_vals(match) -> int:
+    return match['a']['val'] + match['b']['val']
+
+class PatternSpec(NamedTuple):
+    lhs: str
+    p: str = None
+    rhs: str = None
+    render_rhs: dict = None
+    is_recursive: bool = False
+
+PATTERNS: dict[str, PatternSpec] = {
+    "chain": PatternSpec(lhs='a->b->c', p='a;b;c', rhs='a;b;c', is_recursive=True),
+    "star": PatternSpec(lhs='a->b;a->c', p='a->b;a->c', rhs='a[hub=1]->b;a->c'),
+    "triangle": PatternSpec(lhs='a->b->c;a->c', p='a->b->c;a->c', rhs='a->b->c;a->c;t;t->a;t->b;t->c'),
+    "shortcut": PatternSpec(lhs='a->b->c;a->c', p='a->b->c', rhs='a->b->c', is_recursive=True),
+    "clone": PatternSpec(lhs='a->b', p='a->b;a*1', rhs='a->b;a*1'),
+    "merge": PatternSpec(lhs='a->b', p='a;b', rhs='a&b', is_recursive=True),
+    "templated": PatternSpec(lhs='a->b', p='a->b', rhs='a-[sum={{sum}}]->b', render_rhs={'sum': _sum_of_vals}),
+}
+
+# %% ../nbs/07_benchmarks.ipynb 12
+class Benchmark(NamedTuple):
+    name: str
+    group: str
+    setup: Callable[[], Any]
+    run: Callable[[Any], Any]
+    sized: bool = True
+
+def _parse_benchmarks() -> Iterator[Benchmark]:
+    for name, spec in PATTERNS.items():
+        # The pattern cache is cleared before each run, so the parsing itself is timed
+        yield Benchmark(f"lhs_to_graph/{name}", "parse", pattern_cache.clear, lambda _, spec=spec: lhs_to_graph(spec.lhs), sized=False)
+        yield Benchmark(f"lhs_to_graph_cached/{name}", "parse", lambda: None, lambda _, spec=spec: lhs_to_graph(spec.lhs), sized=False)
+
+def _rule_benchmarks() -> Iterator[Benchmark]:
+    operations = [Rule.nodes_to_clone, Rule.nodes_to_remove, Rule.edges_to_remove, Rule.node_attrs_to_remove, Rule.edge_attrs_to_remove,
+                  Rule.nodes_to_merge, Rule.nodes_to_add, Rule.edges_to_add, Rule.node_attrs_to_add, Rule.edge_attrs_to_add]
+    def run(graphs):
+        rule = Rule(*graphs, merge_policy=MergePolicy.choose_last)
+        for operation in operations:
+            operation(rule)
+    for name, spec in PATTERNS.items():
+        # The RHS is rendered with a dummy match, as the placeholders don't change the structure of the rule
+        graphs = (lhs_to_graph(spec.lhs)[0], p_to_graph(spec.p), rhs_to_graph(spec.rhs, None, {key: lambda match: 0 for key in spec.render_rhs or {}}))
+        yield Benchmark(f"Rule/{name}", "rule", lambda graphs=graphs: graphs, run, sized=False)
+
+def _find_matches_benchmarks(size: int, seed: int) -> Iterator[Benchmark]:
+    for pattern_name, spec in PATTERNS.items():
+        pattern, condition = lhs_to_graph(spec.lhs)
+        for generator in GENERATORS:
+            graph = _generated_graph(generator, size, seed)
+            yield Benchmark(f"find_matches/{pattern_name}/{generator}", "matcher", lambda graph=graph: graph,
+                            lambda graph, pattern=pattern, condition=condition: sum(1 for _ in find_matches(graph, pattern, condition)))
+            # Including the construction of the compact snapshot
+            yield Benchmark(f"find_matches_compact/{pattern_name}/{generator}", "matcher", lambda graph=graph: graph,
+                            lambda graph, pattern=pattern, condition=condition: sum(1 for _ in find_matches(graph, pattern, condition, compact=True)))
+            # Excluding the construction of the index, which is kept between rewrites
+            yield Benchmark(f"find_matches_indexed/{pattern_name}/{generator}", "matcher", lambda graph=graph: (graph, AttributeIndex(graph)),
+                            lambda graph_index, pattern=pattern, condition=condition: sum(1 for _ in find_matches(graph_index[0], pattern, condition, index=graph_index[1])))
+
+def _primitive_benchmarks(size: int, seed: int) -> Iterator[Benchmark]:
+    # Each primitive is applied to all the nodes (or edges, or pairs of nodes) of the graph, with an undo log as in a rewrite
+    def nodes(graph): return list(graph.nodes)
+    def edges(graph): return list(graph.edges)
+    def pairs(graph):
+        nodes = list(graph.nodes)
+        return [{nodes[i], nodes[i + 1]} for i in range(0, len(nodes) - 1, 2)]
+    def new_nodes(graph): return [f"new_{i}" for i in range(len(graph.nodes))]
+    def new_edges(graph):
+        nodes = list(graph.nodes)
+        return list({(nodes[i], nodes[(i * 7 + 3) % len(nodes)]) for i in range(len(nodes))} - set(graph.edges) - set(nx.selfloop_edges(graph)))
+
+    primitives = {
+        "_clone_node": (nodes, lambda graph, node, log: _clone_node(graph, node, log)),
+        "_remove_node": (nodes, lambda graph, node, log: _remove_node(graph, node, log)),
+        "_remove_edge": (edges, lambda graph, edge, log: _remove_edge(graph, edge, log)),
+        "_remove_node_attrs": (nodes, lambda graph, node, log: _remove_node_attrs(graph, node, {'val'}, log)),
+        "_remove_edge_attrs": (edges, lambda graph, edge, log: _remove_edge_attrs(graph, edge, {'weight'}, log)),
+        "_merge_nodes": (pairs, lambda graph, pair, log: _merge_nodes(graph, pair, MergePolicy.choose_last, log)),
+        "_add_node": (new_nodes, lambda graph, node, log: _add_node(graph, node, log)),
+        "_add_edge": (new_edges, lambda graph, edge, log: _add_edge(graph, edge, log)),
+        "_add_node_attrs": (nodes, lambda graph, node, log: _add_node_attrs(graph, node, {'extra': 1}, log)),
+        "_add_edge_attrs": (edges, lambda graph, edge, log: _add_edge_attrs(graph, edge, {'extra': 1}, log)),
+    }
+    def run(state, primitive):
+        graph, targets = state
+        undo_log = _UndoLog()
+        for target in targets:
+            primitive(graph, target, undo_log)
+    for name, (targets, primitive) in primitives.items():
+        for generator in GENERATORS:
+            def setup(generator=generator, targets=targets):
+                graph = _generated_graph(generator, size, seed).copy()
+                return graph, targets(graph)
+            yield Benchmark(f"{name}/{generator}", "primitive", setup, lambda state, primitive=primitive: run(state, primitive))
+
+def _rewrite_benchmarks(size: int, seed: int) -> Iterator[Benchmark]:
+    for pattern_name, spec in PATTERNS.items():
+        mode = "recursive" if spec.is_recursive else "single"
+        for generator in GENERATORS:
+            yield Benchmark(f"rewrite/{mode}/{pattern_name}/{generator}", "rewrite",
+                            lambda generator=generator: _generated_graph(generator, size, seed).copy(),
+                            lambda graph, spec=spec: rewrite(graph, lhs=spec.lhs, p=spec.p, rhs=spec.rhs,
+                                                             render_rhs=spec.render_rhs, is_recursive=spec.is_recursive))
+
+VISUALIZATION_MODULES = ("pandas", "IPython", "jinja2", "matplotlib")
+
+def _run_python(code: str) -> str:
+    # A fresh interpreter, which imports this copy of graph_rewrite (even if it isn't installed)
+    package_root = str(Path(graph_rewrite.__file__).parent.parent)
+    python_path = [package_root, os.environ["PYTHONPATH"]] if "PYTHONPATH" in os.environ else [package_root]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(python_path))
+    return subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True).stdout
+
+def _import_benchmarks() -> Iterator[Benchmark]:
+    # Each one starts a new interpreter, so the bare interpreter is timed as well, for reference
+    statements = {
+        "import/python": "pass",
+        "import/graph_rewrite": "import graph_rewrite",
+        "import/first_parse": "from graph_rewrite.lhs import lhs_to_graph; lhs_to_graph('a->b')",
+    }
+    for name, code in statements.items():
+        yield Benchmark(name, "import", lambda: None, lambda _, code=code: _run_python(code), sized=False)
+
+def all_benchmarks(size: int, seed: int = 0) -> Iterator[Benchmark]:
+    """All the benchmarks, for graphs of the given size.
+
+    Args:
+        size (int): The (approximate) number of nodes in the generated graphs
+        seed (int, optional): The seed of the graph generators. Defaults to 0.
+
+    Yields:
+        Iterator[Benchmark]: The benchmarks, lazily (graphs are generated only when their benchmarks are reached)
+    """
+    yield from _import_benchmarks()
+    yield from _parse_benchmarks()
+    yield from _rule_benchmarks()
+    yield from _find_matches_benchmarks(size, seed)
+    yield from _primitive_benchmarks(size, seed)
+    yield from _rewrite_benchmarks(size, seed)
+
+# %% ../nbs/07_benchmarks.ipynb 14
+def _environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "graph_rewrite": graph_rewrite.__version__,
+        "python": platform.python_version(),
+        "networkx": nx.__version__,
+        "platform": platform.platform(),
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+def run_benchmarks(sizes: Iterable[int] = (500,), repeat: int = 5, select: str = None, seed: int = 0) -> dict:
+    """Run the benchmarks, and collect their timings.
+
+    Args:
+        sizes (Iterable[int], optional): The sizes of the generated graphs. Defaults to (500,).
+        repeat (int, optional): The number of times each benchmark is timed. Defaults to 5.
+        select (str, optional): A regular expression; only benchmarks whose name matches it are run. Defaults to None (all of them).
+        seed (int, optional): The seed of the graph generators. Defaults to 0.
+
+    Returns:
+        dict: A JSON-serializable dictionary, with the environment under "environment" and a list of results under "results".
+    """
+    results = []
+    for i, size in enumerate(sizes):
+        for benchmark in all_benchmarks(size, seed):
+            if (not benchmark.sized and i > 0) or (select and not re.search(select, benchmark.name)):
+                continue
+            times = []
+            for _ in range(repeat):
+                state = benchmark.setup()
+                start = time.perf_counter()
+                benchmark.run(state)
+                times.append(time.perf_counter() - start)
+            results.append({
+                "name": benchmark.name,
+                "group": benchmark.group,
+                "size": size if benchmark.sized else None,
+                "times": times,
+                "min": min(times),
+                "median": statistics.median(times),
+            })
+    return {"environment": _environment(), "results": results}
+
+def compare_results(baseline: dict, current: dict) -> dict[str, float]:
+    """Compare the results of two benchmark runs.
+
+    Args:
+        baseline (dict): Results of `run_benchmarks` (e.g. of a previous commit)
+        current (dict): Results of `run_benchmarks`
+
+    Returns:
+        dict[str, float]: Maps each benchmark which appears in both runs ("name@size") to the ratio of its current median time
+                          to its baseline median time (above 1 means slower).
+    """
+    def by_key(run):
+        return {f"{result['name']}@{result['size']}": result['median'] for result in run['results']}
+    baseline, current = by_key(baseline), by_key(current)
+    return {key: current[key] / baseline[key] for key in current if key in baseline and baseline[key] > 0}
+
+# %% ../nbs/07_benchmarks.ipynb 19
+@call_parse
+def benchmark(output: str = None, # A path to write the JSON results to (printed if not given)
+              sizes: str = "500", # Comma separated sizes of the generated graphs
+              repeat: int = 5, # The number of times each benchmark is timed
+              select: str = None, # A regular expression of benchmark names to run
+              seed: int = 0): # The seed of the graph generators
+    "Run the graph_rewrite benchmarks, and write their results as JSON"
+    results = run_benchmarks([int(size) for size in sizes.split(",")], repeat, select, seed)
+    if output is None:
+        print(json.dumps(results, indent=1))
+    else:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=1)
@@ -1,23 +1,25 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/00_core.ipynb.
 
 # %% auto 0
-__all__ = ['NodeName', 'EdgeName', 'plot_consts', 'graph_template', 'GraphRewriteException', 'template_undeclared_vars',
-           'render_jinja', 'mm_ink', 'mm_display', 'mm', 'mm_link', 'mm_path', 'draw']
+__all__ = ['pattern_cache', 'NodeName', 'EdgeName', 'plot_consts', 'graph_template', 'GraphRewriteException', 'CacheInfo',
+           'PatternCache', 'RewriteStats', 'template_undeclared_vars', 'render_jinja', 'mm_ink', 'mm_display', 'mm',
+           'mm_link', 'mm_path', 'draw']
 
 # %% ../nbs/00_core.ipynb 5
 from pathlib import Path
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from threading import Lock
 
 import networkx as nx
 from networkx import DiGraph, planar_layout, spring_layout, draw_networkx_nodes, draw_networkx_labels, draw_networkx_edges
 
 import html
-import pandas as pd
-
-from IPython.display import display
 from typing import *
 
-from jinja2 import Template, Environment, PackageLoader, meta
-
+# pandas, IPython and jinja2 are slow to import and are only needed for visualization and templating,
+# so they are imported by the functions which use them
 
 # %% ../nbs/00_core.ipynb 7
 class GraphRewriteException(Exception):
@@ -27,12 +29,154 @@ class GraphRewriteException(Exception):
         super().__init__(msg)
     pass
 
-# %% ../nbs/00_core.ipynb 10
+# %% ../nbs/00_core.ipynb 9
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+class PatternCache:
+    """A thread-safe LRU cache of parsed patterns."""
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._values = OrderedDict()
+        self._lock = Lock()
+        self._hits, self._misses, self._evictions = 0, 0, 0
+
+    def get(self, key: Hashable, parse: Callable[[], Any]) -> Any:
+        """Get the cached value of a key, or parse it and cache it if it's not in the cache.
+
+        Args:
+            key (Hashable): The key of the value (e.g., the kind of the pattern and its text)
+            parse (Callable[[], Any]): Computes the value of the key. Exceptions it raises are propagated, and nothing is cached.
+
+        Returns:
+            Any: The (shared) cached value. It should not be modified by the caller.
+        """
+        with self._lock:
+            if key in self._values:
+                self._hits += 1
+                self._values.move_to_end(key)
+                return self._values[key]
+            self._misses += 1
+        # Parse outside the lock, so that other threads aren't blocked meanwhile
+        value = parse()
+        with self._lock:
+            self._values[key] = value
+            self._values.move_to_end(key)
+            while len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+                self._evictions += 1
+        return value
+
+    def info(self) -> CacheInfo:
+        """Returns the hit, miss and eviction counters of the cache, as well as its maximal and current sizes."""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, self.maxsize, len(self._values))
+
+    def clear(self):
+        """Remove all the cached values, and reset the counters."""
+        with self._lock:
+            self._values.clear()
+            self._hits, self._misses, self._evictions = 0, 0, 0
+
+pattern_cache = PatternCache()
+
+# %% ../nbs/00_core.ipynb 13
+class RewriteStats:
+    """Collects the time spent in each phase of a rewrite (in seconds), and counters of the events that occurred during it.
+
+    The `candidates` counter of a search counts the calls of the node predicate of the pattern. The default search calls it for every
+    graph node it examines, while the search over a compact snapshot (`compact=True`) rules out nodes by their attribute names first,
+    and calls it only for pattern nodes with value constraints. Therefore, the counts of the two searches can't be compared.
+    Predicates which run in worker processes aren't counted."""
+    def __init__(self):
+        self.times: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+        # The phases which are currently timed (innermost last), and when the innermost one was (re)started
+        self._active: list[str] = []
+        self._started = 0.0
+
+    def count(self, counter: str, amount: int = 1):
+        """Add the given amount to a counter."""
+        self.counts[counter] = self.counts.get(counter, 0) + amount
+
+    def merge(self, other: 'RewriteStats'):
+        """Add the times and the counters of another RewriteStats (e.g. of a worker process) to these."""
+        for phase, seconds in other.times.items():
+            self.times[phase] = self.times.get(phase, 0.0) + seconds
+        for counter, amount in other.counts.items():
+            self.count(counter, amount)
+
+    def _stop_current(self, now: float):
+        if self._active:
+            current = self._active[-1]
+            self.times[current] = self.times.get(current, 0.0) + now - self._started
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as the given phase. The time of nested phases is not counted in the enclosing phase."""
+        now = time.perf_counter()
+        self._stop_current(now)
+        self._active.append(name)
+        self._started = now
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self._stop_current(now)
+            self._active.pop()
+            self._started = now
+
+    def timed_iter(self, iterable: Iterable, phase: str, counter: str = None) -> Iterator:
+        """Iterate over an iterable (e.g. a lazy search), timing the production of each item as the given phase,
+        and counting the items in the given counter."""
+        iterator = iter(iterable)
+        while True:
+            with self.phase(phase):
+                item = next(iterator, _exhausted)
+            if item is _exhausted:
+                return
+            if counter is not None:
+                self.count(counter)
+            yield item
+
+    def timed_func(self, func: Callable[..., bool], phase: str, counter: str = None, rejected: str = None) -> Callable[..., bool]:
+        """Wrap a predicate, so that its calls are timed as the given phase and counted in the given counter,
+        and the calls that return False are counted in the `rejected` counter."""
+        def timed(*args):
+            with self.phase(phase):
+                result = func(*args)
+            if counter is not None:
+                self.count(counter)
+            if rejected is not None and not result:
+                self.count(rejected)
+            return result
+        return timed
+
+    def as_dict(self) -> dict:
+        """The times and counters, as a JSON-serializable dictionary."""
+        return {"times": dict(self.times), "counts": dict(self.counts)}
+
+    def __repr__(self):
+        times = ", ".join(f"{phase}={seconds:.4f}s" for phase, seconds in self.times.items())
+        counts = ", ".join(f"{counter}={amount}" for counter, amount in self.counts.items())
+        return f"RewriteStats(times: {times}; counts: {counts})"
+
+_exhausted = object()
+
+def _phase(stats: Optional[RewriteStats], name: str):
+    # A context manager that times a phase if stats are collected, and does nothing otherwise
+    return stats.phase(name) if stats is not None else nullcontext()
+
+# %% ../nbs/00_core.ipynb 17
 NodeName = str
 # When defining an edge, the first node is the source and the second is the target (as we use directed graphs).
 EdgeName = Tuple[NodeName, NodeName]
 
-# %% ../nbs/00_core.ipynb 12
+# %% ../nbs/00_core.ipynb 19
 def _create_graph(nodes: list[Union[NodeName, Tuple[NodeName, dict]]], edges: list[Union[EdgeName, Tuple[NodeName, NodeName, dict]]]) -> DiGraph:
     """Construct a directed graph (NetworkX DiGraph) out of lists of nodes and edges.
 
@@ -51,7 +195,7 @@ def _create_graph(nodes: list[Union[NodeName, Tuple[NodeName, dict]]], edges: li
     g.add_edges_from(edges)
     return g
 
-# %% ../nbs/00_core.ipynb 14
+# %% ../nbs/00_core.ipynb 21
 plot_consts = {
     "node_size": 300,
     "node_color": 'g',
@@ -72,7 +216,7 @@ plot_consts = {
     "layouting_method": planar_layout
 }
 
-# %% ../nbs/00_core.ipynb 16
+# %% ../nbs/00_core.ipynb 23
 def _plot_graph(g: DiGraph, hl_nodes: set[NodeName] = set(), hl_edges: set[EdgeName] = set(), node_attrs: bool = False, edge_attrs: bool = False):
     """Plot a graph, and potentially highlight certain nodes and edges.
 
@@ -84,6 +228,8 @@ def _plot_graph(g: DiGraph, hl_nodes: set[NodeName] = set(), hl_edges: set[EdgeN
         edge_attrs (bool, optional): If true, print edge attributes. Defaults to False.
     """
     global plot_consts
+    import pandas as pd
+    from IPython.display import display
 
     # Seperate highlighted nodes and edges, remove if doesn't exist in the graph g
     hl_nodes = [node for node in g.nodes() if node in hl_nodes]
@@ -123,7 +269,7 @@ def _plot_graph(g: DiGraph, hl_nodes: set[NodeName] = set(), hl_edges: set[EdgeN
         except:
             print("Graph isn't planar, priniting in spring layout mode.")
 
-# %% ../nbs/00_core.ipynb 18
+# %% ../nbs/00_core.ipynb 25
 def _graphs_equal(graph1: DiGraph, graph2: DiGraph) -> bool:  
     """Compare two graphs - nodes, edges and attributes.
 
@@ -161,7 +307,7 @@ def _graphs_equal(graph1: DiGraph, graph2: DiGraph) -> bool:
     #graph_structure_equal = nx.is_isomorphic(graph1, graph2)
     return True
 
-# %% ../nbs/00_core.ipynb 20
+# %% ../nbs/00_core.ipynb 27
 def template_undeclared_vars(template):
     """Computes all undeclared vars in a jinja template
 
@@ -173,6 +319,7 @@ def template_undeclared_vars(template):
     """
     if isinstance(template, Path):
         template = template.read_text()
+    from jinja2 import Environment, meta
     env = Environment()
     parsed_content = env.parse(template)
     return meta.find_undeclared_variables(parsed_content)
@@ -191,6 +338,7 @@ def render_jinja(template, params: dict, silent=True, to_file: Path = None):
     """
     if isinstance(template, Path):
         template = template.read_text()
+    from jinja2 import Template
     instance_str = Template(template).render(**params)
 
     if not silent:
@@ -203,12 +351,11 @@ def render_jinja(template, params: dict, silent=True, to_file: Path = None):
         return instance_str
     
 
-# %% ../nbs/00_core.ipynb 22
+# %% ../nbs/00_core.ipynb 29
 # visualizing the graph
 import base64
-from IPython.display import Image, display
 
-# %% ../nbs/00_core.ipynb 24
+# %% ../nbs/00_core.ipynb 31
 def mm_ink(graphbytes):
     """Given a bytes object holding a Mermaid-format graph, return a URL that will generate the image."""
     base64_bytes = base64.b64encode(graphbytes)
@@ -218,6 +365,7 @@ def mm_ink(graphbytes):
 
 def mm_display(graphbytes):
     """Given a bytes object holding a Mermaid-format graph, display it."""
+    from IPython.display import Image, display
     display(Image(url=mm_ink(graphbytes)))
 
 
@@ -239,7 +387,7 @@ def mm_path(path):
         graphbytes = f.read()
     mm_display(graphbytes)
 
-# %% ../nbs/00_core.ipynb 26
+# %% ../nbs/00_core.ipynb 33
 graph_template = """
 flowchart {{direction}}
 {% for i,name,desc,style in nodes -%}
@@ -0,0 +1,154 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/08_fast_parse.ipynb.
+
+# %% auto 0
+__all__ = []
+
+# %% ../nbs/08_fast_parse.ipynb 5
+import re
+from typing import *
+import networkx as nx
+from networkx import DiGraph
+
+# %% ../nbs/08_fast_parse.ipynb 7
+_WS = re.compile(r'[ \t\f\r\n]*')
+_VERTEX_NAME = {"LHS": re.compile(r'[_a-zA-Z0-9]+'), "P": re.compile(r'[_a-zA-Z0-9\*]+'), "RHS": re.compile(r'[_a-zA-Z0-9\*&]+')}
+_ATTR_NAME = re.compile(r'[_a-zA-Z0-9]+')
+# A string without escapes, a float with a fraction, an integer, or a placeholder
+_VALUE = re.compile(r'"([^"\\\n]*)"|([0-9]+\.[0-9]+)|([0-9]+)|\{\{([^[\]{};=]*)\}\}')
+_TYPES = {"LHS": {"int", "str", "bool", "float"}, "RHS": {"int", "string"}}
+
+class _NotSimple(Exception):
+    """The pattern is outside of the simple subset (or isn't valid at all), so it should be parsed by Lark."""
+
+class _SimpleParser:
+    """A single-pass parser of the simple subset of the pattern syntax, which builds the pattern graph and the constraints
+    exactly as `graphRewriteTransformer` does for a Lark parse tree."""
+    def __init__(self, text: str, component: str, placeholder: Callable[[str], Any] = None):
+        self.text, self.pos, self.component, self.placeholder = text, 0, component, placeholder
+        self.nodes: dict[str, dict] = {}
+        self.edges: dict[Tuple[str, str], dict] = {}
+        self.constraints: dict[str, dict] = {}
+        self.anonymous = 0
+
+    def _peek(self) -> str:
+        self.pos = _WS.match(self.text, self.pos).end()
+        return self.text[self.pos:self.pos + 2]
+
+    def _take(self, token: str) -> bool:
+        if self._peek().startswith(token):
+            self.pos += len(token)
+            return True
+        return False
+
+    def _token(self, regex: re.Pattern) -> re.Match:
+        self._peek()
+        token = regex.match(self.text, self.pos)
+        if token is None:
+            raise _NotSimple()
+        self.pos = token.end()
+        return token
+
+    def _attribute(self) -> Tuple[str, Optional[str], Any]:
+        name = self._token(_ATTR_NAME).group()
+        if self.component == "P":
+            return name, None, None
+        required_type, value = None, None
+        if self._take(":"):
+            required_type = self._token(_ATTR_NAME).group()
+            if required_type not in _TYPES[self.component]:
+                raise _NotSimple()
+        if self._take("="):
+            string, real, integer, placeholder = self._token(_VALUE).groups()
+            if string is not None:
+                value = string
+            elif real is not None:
+                value = float(real)
+            elif integer is not None:
+                value = int(integer)
+            elif self.component == "RHS" and self.placeholder is not None:
+                value = self.placeholder(placeholder)
+            else:
+                raise _NotSimple()
+        return name, required_type, value
+
+    def _attributes(self) -> Tuple[dict, dict]:
+        # The attributes (name -> None, or the RHS value), and the LHS constraints (name -> (type, value))
+        attrs, constraints = {}, {}
+        if not self._take("["):
+            return attrs, constraints
+        while True:
+            name, required_type, value = self._attribute()
+            attrs[name] = None if self.component == "LHS" else value
+            if self.component == "LHS":
+                constraints[name] = (required_type, value)
+            if self._take("]"):
+                return attrs, constraints
+            if not self._take(","):
+                raise _NotSimple()
+
+    def _vertex(self) -> str:
+        name = self._token(_VERTEX_NAME[self.component]).group()
+        if self.component == "LHS" and name == "_":
+            name = f"_{self.anonymous}"
+            self.anonymous += 1
+        attrs, constraints = self._attributes()
+        self.nodes.setdefault(name, {}).update(attrs)
+        if self.component == "LHS" and attrs:
+            self.constraints.setdefault(name, {}).update(constraints)
+        return name
+
+    def _pattern(self):
+        # Within a pattern, the attributes of a repeated edge are merged, but a later pattern replaces them,
+        # and the constraints of the edges come after those of the vertices
+        pattern_edges, edge_constraints = {}, []
+        src = self._vertex()
+        while True:
+            if self._take("->"):
+                attrs, constraints = {}, {}
+            elif self._take("-"):
+                attrs, constraints = self._attributes()
+                if not attrs or not self._take("->"):
+                    raise _NotSimple()
+            else:
+                break
+            dst = self._vertex()
+            pattern_edges.setdefault((src, dst), {}).update(attrs)
+            edge_constraints.append((f"{src}->{dst}", constraints))
+            src = dst
+        self.edges.update(pattern_edges)
+        for edge, constraints in edge_constraints:
+            constraints = {name: constraint for name, constraint in constraints.items() if constraint != (None, None)}
+            if constraints:
+                self.constraints[edge] = constraints
+
+    def patterns(self) -> Tuple[DiGraph, dict]:
+        if self._peek() != "" or self.component == "LHS":
+            self._pattern()
+            while self._take(";"):
+                self._pattern()
+            if self._peek() != "":
+                raise _NotSimple()
+        graph = DiGraph()
+        graph.add_nodes_from(self.nodes.items())
+        graph.add_edges_from((src, dst, attrs) for (src, dst), attrs in self.edges.items())
+        return graph, self.constraints
+
+def _parse_simple(text: str, component: str, placeholder: Callable[[str], Any] = None) -> Optional[Tuple[DiGraph, dict]]:
+    """Parse a pattern with the fast path, if it's in the simple subset of the syntax: vertices (named or anonymous) joined by plain
+    or attributed edges, and `;`-separated patterns, where attribute values are integers, decimal floats, strings without escapes,
+    or (in an RHS) placeholders.
+
+    Args:
+        text (str): An LHS, P or RHS pattern string
+        component (str): The kind of the pattern - "LHS", "P" or "RHS"
+        placeholder (Callable[[str], Any], optional): Called with the name of every RHS placeholder, to create its value.
+            Defaults to None (patterns with placeholders are left to Lark).
+
+    Returns:
+        Optional[Tuple[DiGraph, dict]]: The pattern graph and its constraints (as `graphRewriteTransformer` returns them),
+            or None if the pattern should be parsed by Lark.
+    """
+    try:
+        return _SimpleParser(text, component, placeholder).patterns()
+    except _NotSimple:
+        return None
@@ -1,20 +1,26 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/01_lhs_parsing.ipynb.
 
 # %% auto 0
-__all__ = ['lhs_parser', 'RenderFunc', 'cnt', 'graphRewriteTransformer', 'lhs_to_graph']
+__all__ = ['RenderFunc', 'cnt', 'AttrCheck', 'graphRewriteTransformer', 'lhs_to_graph', 'lhs_parser']
 
 # %% ../nbs/01_lhs_parsing.ipynb 7
 import copy
+import operator
+from functools import partial, cache
+from typing import *
 from collections.abc import Callable
 import networkx as nx
 from lark import Transformer, Lark
 from lark import UnexpectedCharacters, UnexpectedToken
 from .match_class import Match
-from .core import GraphRewriteException
+from .fast_parse import _parse_simple
+from .core import GraphRewriteException, NodeName, EdgeName, pattern_cache
 from .core import _create_graph,  _graphs_equal, draw
 
 # %% ../nbs/01_lhs_parsing.ipynb 9
-lhs_parser = Lark(r"""
+_all_ = ['lhs_parser']
+
+_lhs_grammar = r"""
     %import common.INT -> INT 
     %import common.FLOAT -> FLOAT
     %import common.ESCAPED_STRING -> STRING
@@ -47,10 +53,22 @@ lhs_parser = Lark(r"""
     pattern: vertex (connection vertex)*
     patterns: pattern (";" pattern)*
 
-    """, parser="lalr", start='patterns' , debug=True)
+    """
+
+@cache
+def _lhs_parser() -> Lark:
+    # Built on first use rather than on import. Lark keeps the LALR tables of the grammar in a cache file,
+    # so later processes load them instead of computing them again
+    return Lark(_lhs_grammar, parser="lalr", start='patterns', cache=True)
 
 # multi_connection: "-" NATURAL_NUMBER "+" [attributes] "->"  - setting for the "-num+->" feature
 
+def __getattr__(name: str):
+    # The parser is still available as `lhs_parser`, and is built when it's first accessed
+    if name == 'lhs_parser':
+        return _lhs_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # %% ../nbs/01_lhs_parsing.ipynb 11
 RenderFunc = Callable[[Match], any] # type of a function to render a parameter
 
@@ -248,6 +266,92 @@ class graphRewriteTransformer(Transformer):
         return (G, copy.deepcopy(self.constraints)) 
 
 # %% ../nbs/01_lhs_parsing.ipynb 14
+_str_to_type = {"str": str, "float": float, "int": int, "bool": bool}
+
+def _has_type(required_type: type, value) -> bool:
+    return isinstance(value, required_type)
+
+AttrCheck = Tuple[Union[NodeName, EdgeName], str, Callable[[Any], bool]] # (pattern node / edge, attribute name, check of its value)
+
+def _compile_constraints(constraints: dict) -> list[AttrCheck]:
+    """Convert the constraints collected by the transformer into a flat list of checks.
+
+    Args:
+        constraints (dict): Maps pattern nodes and edges (named "{src}->{dst}") to dictionaries of
+                            attribute name -> (required type, required value), where each may be None.
+
+    Returns:
+        list[AttrCheck]: A list of (pattern node / edge, attribute name, check) triplets, where edges are given as (src, dst) pairs,
+                         and each check receives the attribute's value and returns True if the constraint holds.
+    """
+    checks = []
+    for graph_obj, obj_constraints in constraints.items():
+        element = tuple(graph_obj.split("->")) if "->" in graph_obj else graph_obj
+        for attr_name, (required_type_str, required_value) in obj_constraints.items():
+            if required_value is not None:
+                checks.append((element, attr_name, partial(operator.eq, required_value)))
+            if required_type_str is not None:
+                checks.append((element, attr_name, partial(_has_type, _str_to_type[required_type_str])))
+    return checks
+
+def _match_satisfies(match: Match, checks: list[AttrCheck]) -> bool:
+    """Check whether a match satisfies a list of compiled constraints.
+
+    Args:
+        match (Match): A match of the pattern, including its anonymous nodes.
+        checks (list[AttrCheck]): Compiled constraints of the pattern.
+
+    Raises:
+        GraphRewriteException: If a constrained node or edge is not mapped to the graph, or was removed from it.
+
+    Returns:
+        bool: True if all the checks hold, False otherwise.
+    """
+    graph, mapping = match.graph, match.mapping
+    try:
+        for element, attr_name, check in checks:
+            if type(element) is tuple:
+                attrs = graph.edges[mapping[element[0]], mapping[element[1]]]
+            else:
+                attrs = graph.nodes[mapping[element]]
+            if not check(attrs[attr_name]):
+                return False
+        return True
+    except KeyError:
+        raise GraphRewriteException(f"The symbol {element} does not exist in the pattern, or it was removed from the graph")
+
+# %% ../nbs/01_lhs_parsing.ipynb 16
+def _parse_lhs(lhs: str) -> Tuple[nx.DiGraph, list[AttrCheck]]:
+    """Parse an LHS pattern into its graph and its compiled constraints.
+
+    Args:
+        lhs (string): A string in lhs format
+
+    Returns:
+        Tuple[DiGraph, list[AttrCheck]]: The pattern graph, and the checks of its value and type constraints.
+    """
+    # Simple patterns are parsed directly, and the rest by Lark (see `fast_parse`)
+    parsed = _parse_simple(lhs, "LHS")
+    if parsed is None:
+        tree = _lhs_parser().parse(lhs)
+        parsed = graphRewriteTransformer(component="LHS").transform(tree)
+    final_graph, constraints = parsed
+    # constraints is a dictionary: vertex/edge -> {attr_name: (value, type), ...}, compile it into a list of checks
+    checks = _compile_constraints(constraints)
+    # keep the checks with the pattern graph as well, so the matcher can check them during the search
+    final_graph.graph['constraints'] = checks
+    # and the required values themselves, so the matcher can look up nodes and edges by them (see `AttributeIndex`)
+    final_graph.graph['required_values'] = {
+        tuple(graph_obj.split("->")) if "->" in graph_obj else graph_obj: {attr_name: value for attr_name, (_, value) in obj_constraints.items() if value is not None}
+        for graph_obj, obj_constraints in constraints.items()}
+    return final_graph, checks
+
+def _type_condition(checks: list[AttrCheck], condition, match: Match) -> bool:
+    # True <=> the match satisfies all the constraints (and the user's condition, if there is one).
+    if not _match_satisfies(match, checks):
+        return False
+    return condition == None or condition(match)
+
 def lhs_to_graph(lhs: str, condition = None,debug=False):
     """Given an LHS pattern and a condition function, return the directed graph represented by the pattern, 
     along with an updated condition function that combines the original constraints and the new value and type constraints
@@ -263,42 +367,16 @@ def lhs_to_graph(lhs: str, condition = None,debug=False):
                                       and an extended condition function as mentioned above.
     """
     try:
-        tree = lhs_parser.parse(lhs)
         if debug:
-            return tree, None
-        final_graph, constraints = graphRewriteTransformer(component="LHS").transform(tree)
-        # constraints is a dictionary: vertex/edge -> {attr_name: (value, type), ...}
+            return _lhs_parser().parse(lhs), None
+        cached_graph, checks = pattern_cache.get(("LHS", lhs), lambda: _parse_lhs(lhs))
+        final_graph = cached_graph.copy()
+        # the containers of the graph attributes are shared by the shallow copy, so each call gets its own
+        final_graph.graph['constraints'] = list(checks)
+        final_graph.graph['required_values'] = {element: dict(values) for element, values in cached_graph.graph['required_values'].items()}
 
         # add the final constraints to the "condition" function
-        def type_condition(match: Match):
-            flag = True
-            for graph_obj in constraints.keys():
-                obj_constraints = constraints[graph_obj]
-                for attr_name in obj_constraints.keys():
-                    required_type_str, required_value = obj_constraints[attr_name]
-
-                    # check value constraint
-                    if required_value != None:
-                        if not hasattr(required_value, '__eq__') or (not required_value == match[graph_obj][attr_name]):
-                            flag = False
-                    
-                    # check type constraint only of value was not checked
-                    str_to_type = {"str":str, "float":float, "int":int, "bool":bool}
-                    if not required_type_str == None:
-                        required_type = str_to_type[required_type_str]
-                    else:
-                        required_type = None
-                    
-                    if required_type_str != None and not isinstance(match[graph_obj][attr_name], required_type):
-                        flag = False
-    
-            # True <=> the match satisfies all the constraints.
-            if condition == None:
-                return flag
-            else:
-                return flag and condition(match) 
-                
-        return final_graph, type_condition
+        # (a partial of a module function rather than a closure, so it can be sent to worker processes)
+        return final_graph, partial(_type_condition, checks, condition)
     except (BaseException, UnexpectedCharacters, UnexpectedToken) as e:
         raise GraphRewriteException('Unable to convert LHS: {}'.format(e))
-
@@ -67,11 +67,20 @@ class Match:
     def set_graph(self, graph: DiGraph):
         self.graph = graph
 
+    def key(self) -> frozenset:
+        """Returns a canonical, hashable representation of the match - the set of (pattern node, input graph node) pairs of its mapping.
+        Two matches are equal if and only if their keys are equal.
+        """
+        return frozenset(self.mapping.items())
+
     def __eq__(self, other):
         if type(other) is Match and len(other.mapping.items()) == len(self.mapping.items()):
             return all([other.mapping.get(k) == v for k,v in self.mapping.items()])
         return False
 
+    # Matches aren't hashable, as their mappings can change. Their keys are, and should be used instead (e.g. for sets of matches).
+    __hash__ = None
+
     def __getitem__(self, key: Union[NodeName, str]):
         """Returns the node / edge of the input graph, which was mapped by the key in the pattern during matching.
 
@@ -128,7 +137,7 @@ def mapping_to_match(input: DiGraph, pattern: DiGraph, mapping: Dict[NodeName, N
 
     return Match(input, nodes_list, edges_list, cleared_mapping)
 
-# %% ../nbs/02_match_class.ipynb 39
+# %% ../nbs/02_match_class.ipynb 41
 def draw_match(g,m,**kwargs):
     g_copy = g.copy()
     node_styles={}
@@ -1,17 +1,24 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/03_matcher.ipynb.
 
 # %% auto 0
-__all__ = ['FilterFunc', 'find_matches']
+__all__ = ['FilterFunc', 'AttributeIndex', 'GraphStatistics', 'PlanStep', 'MatchPlan', 'plan_matching', 'find_matches']
 
 # %% ../nbs/03_matcher.ipynb 5
+import itertools
+import math
+import weakref
+from array import array
+from bisect import bisect_left
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from typing import *
+import networkx as nx
 from networkx import DiGraph
-from networkx.algorithms import isomorphism # check subgraph's isom.
-import itertools # iterating over all nodes\edges combinations
 
-from .core import NodeName, _create_graph, draw
-from .lhs import lhs_to_graph
-from .match_class import Match, mapping_to_match, is_anonymous_node,draw_match
+from .core import NodeName, EdgeName, RewriteStats, _create_graph, draw
+from .lhs import lhs_to_graph, _type_condition
+from .match_class import Match, mapping_to_match, is_anonymous_node, draw_match
 
 # %% ../nbs/03_matcher.ipynb 8
 def _attributes_exist(input_graph_attrs: dict, pattern_attrs: dict) -> bool:
@@ -31,125 +38,1139 @@ def _attributes_exist(input_graph_attrs: dict, pattern_attrs: dict) -> bool:
     return set(pattern_attrs.keys()).issubset(set(input_graph_attrs.keys()))
 
 # %% ../nbs/03_matcher.ipynb 10
-def _does_node_match_pattern(graph_node_attrs: dict, pattern: DiGraph) -> bool:
-    """Given the attributes of some input-graph node, checks whether this node
-    has the same attributes as some node in the pattern graph. If it does,
-    then the node by match that node in the pattern - and thus, might be included
-    in a subgraph that will match the entire pattern.
+def _pattern_predicates(pattern: DiGraph) -> Tuple[Callable[[NodeName, dict], bool], Callable[[NodeName, NodeName, dict], bool]]:
+    """Construct the predicates which decide whether an input-graph node (or edge) can be matched as some pattern node (or edge),
+    based on the attributes of the pattern and the compiled value constraints stored with it by the LHS Parser.
 
     Args:
-        graph_node_attrs (dict): Attributes of some input-graph node.
         pattern (DiGraph): A pattern graph produced by the LHS Parser.
 
     Returns:
-        bool: True if the input-graph node has the same attributes as some pattern node, False otherwise.
+        Tuple[Callable[[NodeName, dict], bool], Callable[[NodeName, NodeName, dict], bool]]: A node predicate, which receives
+            a pattern node and the attributes of an input-graph node, and an edge predicate, which receives the endpoints of a
+            pattern edge and the attributes of an input-graph edge.
     """
-    return any([_attributes_exist(graph_node_attrs, pattern_attr) for (_, pattern_attr) in pattern.nodes(data=True)])
+    # Group the required attributes and the value checks by pattern node / edge, once for the entire search
+    required = {node: set(attrs.keys()) for node, attrs in pattern.nodes(data=True)}
+    required.update({(src, dst): set(attrs.keys()) for src, dst, attrs in pattern.edges(data=True)})
+    checks = {element: [] for element in required}
+    for element, attr_name, check in pattern.graph.get('constraints', []):
+        checks[element].append((attr_name, check))
+
+    def element_match(element, input_graph_attrs: dict) -> bool:
+        return input_graph_attrs.keys() >= required[element] and \
+            all(check(input_graph_attrs[attr_name]) for attr_name, check in checks[element])
+
+    def node_match(pattern_node: NodeName, input_graph_attrs: dict) -> bool:
+        return element_match(pattern_node, input_graph_attrs)
+
+    def edge_match(pattern_src: NodeName, pattern_dst: NodeName, input_graph_attrs: dict) -> bool:
+        return element_match((pattern_src, pattern_dst), input_graph_attrs)
+
+    return node_match, edge_match
 
 # %% ../nbs/03_matcher.ipynb 12
-def _find_structural_matches(graph: DiGraph, pattern: DiGraph) -> Tuple[DiGraph, dict[NodeName, NodeName]]:
-    """Given a graph, find all of its subgraphs which have the same structure (same nodes and edges)
-    as a given pattern DiGraph. That is, all subgraphs which are isomorphic to the pattern.
+def _is_hashable(value) -> bool:
+    # isinstance(value, Hashable) holds for tuples of lists as well, which can't be hashed
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+class AttributeIndex:
+    """An inverted index of the attributes of a graph: maps every attribute name, and every (attribute name, value) pair,
+    to the nodes and to the edges which have it. Values which can't be hashed are indexed only by their attribute name.
+
+    The index doesn't follow changes of the graph by itself. Rewrites which are given the index keep it up to date
+    (see `rewrite`), and after other changes, the changed nodes should be passed to `refresh`."""
+    def __init__(self, graph: DiGraph):
+        self.graph = graph
+        # Index keys - (name,) or (name, value) - mapped to the nodes / edges that have them (dictionaries keep their order)
+        self._nodes: dict[tuple, dict[NodeName, None]] = {}
+        self._edges: dict[tuple, dict[EdgeName, None]] = {}
+        # The index keys of every indexed node / edge, and the indexed edges of every node, for removing them from the index
+        self._node_keys: dict[NodeName, list[tuple]] = {}
+        self._edge_keys: dict[EdgeName, list[tuple]] = {}
+        self._edges_of: dict[NodeName, set[EdgeName]] = {}
+        for node in graph.nodes:
+            self._index_node(node)
+        for edge in graph.edges:
+            self._index_edge(edge)
+
+    @staticmethod
+    def _keys(attrs: dict) -> list[tuple]:
+        keys = []
+        for name, value in attrs.items():
+            keys.append((name,))
+            if _is_hashable(value):
+                keys.append((name, value))
+        return keys
+
+    def nodes_with(self, name: Hashable, *value) -> Collection[NodeName]:
+        """The nodes which have the given attribute (with the given value, if one is given)."""
+        return self._nodes.get((name, *value), {}).keys()
+
+    def edges_with(self, name: Hashable, *value) -> Collection[EdgeName]:
+        """The edges which have the given attribute (with the given value, if one is given)."""
+        return self._edges.get((name, *value), {}).keys()
+
+    def _index_node(self, node: NodeName):
+        self._node_keys[node] = self._keys(self.graph.nodes[node])
+        for key in self._node_keys[node]:
+            self._nodes.setdefault(key, {})[node] = None
+
+    def _index_edge(self, edge: EdgeName):
+        self._edge_keys[edge] = self._keys(self.graph.edges[edge])
+        for key in self._edge_keys[edge]:
+            self._edges.setdefault(key, {})[edge] = None
+        for node in edge:
+            self._edges_of.setdefault(node, set()).add(edge)
+
+    @staticmethod
+    def _unindex(entries: dict[tuple, dict], element_keys: dict[Hashable, list[tuple]], element: Hashable):
+        for key in element_keys.pop(element, []):
+            del entries[key][element]
+            if len(entries[key]) == 0:
+                del entries[key]
+
+    def refresh(self, nodes: Iterable[NodeName]):
+        """Index the given nodes and their edges again, after they were changed (added, removed, or had their attributes or edges changed).
+
+        Args:
+            nodes (Iterable[NodeName]): The changed nodes. A changed edge should be given by its endpoints.
+        """
+        nodes = set(nodes)
+        for node in nodes:
+            self._unindex(self._nodes, self._node_keys, node)
+            for edge in self._edges_of.pop(node, set()):
+                self._unindex(self._edges, self._edge_keys, edge)
+                for endpoint in edge:
+                    self._edges_of.get(endpoint, set()).discard(edge)
+        for node in nodes:
+            if node in self.graph:
+                self._index_node(node)
+                for edge in itertools.chain(self.graph.out_edges(node), self.graph.in_edges(node)):
+                    if edge not in self._edge_keys:
+                        self._index_edge(edge)
+
+def _index_candidates(index: AttributeIndex, pattern: DiGraph, pattern_node: NodeName) -> Optional[list[NodeName]]:
+    """The candidates of a pattern node according to an attribute index: the nodes which have one of its required attributes
+    (with its required value, if there is one), or which have an edge with the attributes that one of its pattern edges requires.
+    The smallest of these sets is returned, as the candidates are checked by the predicates anyway.
+    None if the pattern node (and its edges) requires no attributes."""
+    values = pattern.graph.get('required_values', {})
+    def lookup(find: Callable, element, attrs: dict) -> list[Collection]:
+        element_values = values.get(element, {})
+        return [find(name, element_values[name]) if name in element_values and _is_hashable(element_values[name]) else find(name)
+                for name in attrs]
+
+    # Nodes with the required attributes, or edges with the required attributes (and the end of them the pattern node is at)
+    entries = [(nodes, None) for nodes in lookup(index.nodes_with, pattern_node, pattern.nodes[pattern_node])]
+    for src, dst, attrs in itertools.chain(pattern.out_edges(pattern_node, data=True), pattern.in_edges(pattern_node, data=True)):
+        entries.extend((edges, 0 if src == pattern_node else 1) for edges in lookup(index.edges_with, (src, dst), attrs))
+    if len(entries) == 0:
+        return None
+    elements, endpoint = min(entries, key=lambda entry: len(entry[0]))
+    return list(elements) if endpoint is None else list(dict.fromkeys(edge[endpoint] for edge in elements))
+
+# %% ../nbs/03_matcher.ipynb 15
+def _match_order(pattern: DiGraph, first: Iterable[NodeName] = (), graph_stats: 'GraphStatistics' = None) -> list[NodeName]:
+    """Order the pattern nodes for the structural search. Each connected part of the pattern
+    begins with its node of highest degree, and continues with the node that has the most edges
+    to the nodes ordered so far (ties are broken by degree). Therefore, every node other than
+    the first node of its part is adjacent to some node that comes before it.
 
     Args:
-        graph (DiGraph): A graph to find matches in
         pattern (DiGraph): A pattern graph produced by the LHS Parser.
+        first (Iterable[NodeName], optional): Pattern nodes to put at the beginning of the order (e.g., nodes whose match is known in advance).
+            Defaults to no such nodes.
+        graph_stats (GraphStatistics, optional): Statistics of the input graph. If given, the order is planned by `plan_matching` instead.
+            Defaults to None.
 
-    Yields:
-        Iterator[Tuple[DiGraph, dict[NodeName, NodeName]]]: Iterator of (subgraph, mapping) tuples,
-            where for each pair, the subgraph is the subset of nodes and edges in the input graph that
-            match the pattern, and the mapping is a dictionary that maps nodes in that subgraph
-            to nodes in the pattern.
-    """
-    for sub_nodes in itertools.combinations(graph.nodes, len(pattern.nodes)):
-        nodes_subg: DiGraph = graph.subgraph(sub_nodes)
-        for sub_edges in itertools.combinations(nodes_subg.edges(data=True), len(pattern.edges)):
-            # Create a subgraph with selected edges and nodes
-            subg = DiGraph()
-            subg.add_nodes_from(list(nodes_subg.nodes(data=True)))
-            subg.add_edges_from(list(sub_edges))
-
-            # Find structural matches with the selected edges and nodes
-            matcher = isomorphism.DiGraphMatcher(pattern, subg)
-            for isom_mapping in matcher.isomorphisms_iter():
-                yield (nodes_subg, isom_mapping)
-
-# %% ../nbs/03_matcher.ipynb 14
-def _does_isom_match_pattern(isom: Tuple[DiGraph, dict], pattern: DiGraph) -> bool:
-    """Given a graph that is isomorphic to the pattern, checks whether they also
-    match in terms of their attributes (that is, the graph has the same attributes
-    as the pattern). If they does, then the isomorphic graph matches the pattern completely.
-
-    Args:
-        isom (Tuple[DiGraph, dict]): A graph that's isomorphic to the pattern
+    Returns:
+        list[NodeName]: The pattern nodes, in the order in which they should be matched.
+    """
+    if graph_stats is not None:
+        return plan_matching(pattern, graph_stats, first).order
+    order = list(first)
+    ordered = set(order)
+    while len(order) < len(pattern.nodes):
+        def priority(node):
+            neighbors = set(pattern.successors(node)) | set(pattern.predecessors(node))
+            return (len(neighbors & ordered), pattern.degree(node))
+        next_node = max([node for node in pattern.nodes if node not in ordered], key=priority)
+        order.append(next_node)
+        ordered.add(next_node)
+    return order
+
+# %% ../nbs/03_matcher.ipynb 17
+def _search_plan(pattern: DiGraph, order: list[NodeName]) -> list[Tuple[NodeName, list[NodeName], list[NodeName], bool]]:
+    """Given the order in which pattern nodes are matched, compute for every pattern node the edges that should
+    be checked when it is matched, that is, its edges to pattern nodes which were matched before it.
+
+    Args:
+        pattern (DiGraph): A pattern graph produced by the LHS Parser.
+        order (list[NodeName]): The order in which the pattern nodes are matched.
+
+    Returns:
+        list[Tuple[NodeName, list[NodeName], list[NodeName], bool]]: A step per pattern node (in the given order),
+            which holds the pattern node, the earlier nodes it has edges to, the earlier nodes that have edges to it,
+            and whether it has a self loop.
+    """
+    plan, earlier = [], set()
+    for node in order:
+        out_to = [target for target in pattern.successors(node) if target in earlier]
+        in_from = [src for src in pattern.predecessors(node) if src in earlier]
+        plan.append((node, out_to, in_from, pattern.has_edge(node, node)))
+        earlier.add(node)
+    return plan
+
+# %% ../nbs/03_matcher.ipynb 19
+class _Histogram(NamedTuple):
+    count: int # The number of elements which have the attribute
+    values: dict[Hashable, int] # The number of elements with each of the most common values
+    rest: int # The number of elements with other values
+    rest_distinct: int # The number of other values
+
+class GraphStatistics:
+    """Lightweight statistics of a graph, from which the number of its nodes and edges that match a pattern is estimated:
+    the frequency of every attribute name, a histogram of the values of every attribute, and the degree distribution.
+    A histogram keeps only the most common values, and the other values are assumed to be equally frequent.
+
+    The statistics don't follow changes of the graph, but rough estimates are good enough for planning a search.
+
+    Args:
+        graph (DiGraph): The graph to collect statistics of
+        max_values (int, optional): The number of values kept in the histogram of every attribute. Defaults to 64.
+    """
+    def __init__(self, graph: DiGraph, max_values: int = 64):
+        self.node_count, self.edge_count = graph.number_of_nodes(), graph.number_of_edges()
+        self.self_loop_count = nx.number_of_selfloops(graph)
+        self._node_attrs = self._histograms((attrs for _, attrs in graph.nodes(data=True)), max_values)
+        self._edge_attrs = self._histograms((attrs for _, _, attrs in graph.edges(data=True)), max_values)
+        # The number of nodes with at least d out / in edges, for every d
+        self._out_at_least = self._at_least(degree for _, degree in graph.out_degree())
+        self._in_at_least = self._at_least(degree for _, degree in graph.in_degree())
+
+    @staticmethod
+    def _histograms(all_attrs: Iterable[dict], max_values: int) -> dict[Hashable, _Histogram]:
+        counts, values = Counter(), {}
+        for attrs in all_attrs:
+            for name, value in attrs.items():
+                counts[name] += 1
+                if _is_hashable(value):
+                    values.setdefault(name, Counter())[value] += 1
+        histograms = {}
+        for name, count in counts.items():
+            name_values = values.get(name, Counter())
+            common = dict(name_values.most_common(max_values))
+            histograms[name] = _Histogram(count, common, count - sum(common.values()), len(name_values) - len(common))
+        return histograms
+
+    @staticmethod
+    def _at_least(degrees: Iterable[int]) -> list[int]:
+        histogram = Counter(degrees)
+        at_least = [0] * (max(histogram, default=0) + 2)
+        for degree in range(len(at_least) - 2, -1, -1):
+            at_least[degree] = at_least[degree + 1] + histogram[degree]
+        return at_least
+
+    @staticmethod
+    def _fraction(histograms: dict[Hashable, _Histogram], total: int, attrs: Iterable[Hashable], values: dict) -> float:
+        # The attributes are assumed to be independent
+        fraction = 1.0
+        for name in attrs:
+            histogram = histograms.get(name)
+            if histogram is None or total == 0:
+                return 0.0
+            value = values.get(name)
+            if name not in values or not _is_hashable(value):
+                fraction *= histogram.count / total
+            elif value in histogram.values:
+                fraction *= histogram.values[value] / total
+            else:
+                fraction *= histogram.rest / histogram.rest_distinct / total if histogram.rest_distinct else 0.0
+        return fraction
+
+    def node_fraction(self, attrs: Iterable[Hashable], values: dict = None) -> float:
+        """The estimated fraction of the nodes which have the given attributes (and the given values of some of them)."""
+        return self._fraction(self._node_attrs, self.node_count, attrs, values or {})
+
+    def edge_fraction(self, attrs: Iterable[Hashable], values: dict = None) -> float:
+        """The estimated fraction of the edges which have the given attributes (and the given values of some of them)."""
+        return self._fraction(self._edge_attrs, self.edge_count, attrs, values or {})
+
+    def degree_fraction(self, out_degree: int, in_degree: int) -> float:
+        """The estimated fraction of the nodes which have at least the given out-degree and in-degree."""
+        if self.node_count == 0:
+            return 0.0
+        out_at_least = self._out_at_least[min(out_degree, len(self._out_at_least) - 1)]
+        in_at_least = self._in_at_least[min(in_degree, len(self._in_at_least) - 1)]
+        return out_at_least / self.node_count * in_at_least / self.node_count
+
+# %% ../nbs/03_matcher.ipynb 21
+class PlanStep(NamedTuple):
+    node: NodeName # The pattern node matched at this step
+    out_to: list[NodeName] # The earlier pattern nodes it has edges to
+    in_from: list[NodeName] # The earlier pattern nodes that have edges to it
+    fixed: bool # Whether its match is known in advance
+    estimate: float # The estimated number of partial matches after this step
+
+class MatchPlan(NamedTuple):
+    steps: list[PlanStep]
+
+    @property
+    def order(self) -> list[NodeName]:
+        """The pattern nodes, in the order in which they are matched."""
+        return [step.node for step in self.steps]
+
+    @property
+    def cost(self) -> float:
+        """The estimated number of partial matches the search goes through."""
+        return sum(step.estimate for step in self.steps)
+
+    def __str__(self) -> str:
+        lines = [f"Match plan, estimated cost {self.cost:.4g}:"]
+        for i, step in enumerate(self.steps):
+            edges = [f"{step.node}->{target}" for target in step.out_to] + [f"{src}->{step.node}" for src in step.in_from]
+            how = "fixed" if step.fixed else f"via {', '.join(edges)}" if edges else "scan"
+            lines.append(f"  {i + 1}. {step.node:<10} {how:<30} ~{step.estimate:.4g} partial matches")
+        return "\n".join(lines)
+
+    def explain(self):
+        """Print the plan: the pattern nodes in the order in which they are matched, how the candidates of each one are found
+        (from the matched neighbors, or by scanning the graph), and the estimated number of partial matches after each step."""
+        print(self)
+
+def _plan_from(pattern: DiGraph, graph_stats: GraphStatistics, start: list[NodeName], fixed: bool) -> MatchPlan:
+    """Greedily extend a plan which begins with the given nodes: the next node is always the one after which
+    the fewest partial matches are estimated (ties are broken as in `_match_order`)."""
+    values = pattern.graph.get('required_values', {})
+    nodes, edges = max(graph_stats.node_count, 1), graph_stats.edge_count
+    density = edges / (nodes * nodes)
+    def edge_fraction(src, dst):
+        return graph_stats.edge_fraction(pattern.edges[src, dst], values.get((src, dst)))
+    def node_fraction(node, out_to, in_from):
+        # A node reached through an edge already has that edge, so only the rest of its degree is estimated
+        out_degree, in_degree = pattern.out_degree(node), pattern.in_degree(node)
+        degree_fraction = graph_stats.degree_fraction(out_degree, in_degree) / \
+            max(graph_stats.degree_fraction(min(out_degree, len(out_to)), min(in_degree, len(in_from))), 1e-12)
+        return graph_stats.node_fraction(pattern.nodes[node], values.get(node)) * degree_fraction
+
+    steps, earlier, estimate = [], set(), 1.0
+    def add_step(node, estimate_after, is_fixed):
+        out_to = [target for target in pattern.successors(node) if target in earlier]
+        in_from = [src for src in pattern.predecessors(node) if src in earlier]
+        steps.append(PlanStep(node, out_to, in_from, is_fixed, estimate_after))
+        earlier.add(node)
+
+    def next_estimate(node):
+        out_to = [target for target in pattern.successors(node) if target in earlier]
+        in_from = [src for src in pattern.predecessors(node) if src in earlier]
+        links = [(node, target) for target in out_to] + [(src, node) for src in in_from]
+        if len(links) == 0:
+            # A new connected part, whose candidates are all the nodes
+            result = estimate * nodes * node_fraction(node, [], [])
+        else:
+            # The neighbors through the first edge, which all the other edges (to earlier nodes) must also connect to
+            result = estimate * edges / nodes * node_fraction(node, out_to, in_from) * density ** (len(links) - 1)
+            for src, dst in links:
+                result *= edge_fraction(src, dst)
+        if pattern.has_edge(node, node):
+            result *= graph_stats.self_loop_count / nodes * edge_fraction(node, node)
+        return result
+
+    for node in start:
+        estimate = estimate if fixed else next_estimate(node)
+        add_step(node, estimate, fixed)
+    while len(steps) < len(pattern.nodes):
+        def priority(node):
+            neighbors = set(pattern.successors(node)) | set(pattern.predecessors(node))
+            return (next_estimate(node), -len(neighbors & earlier), -pattern.degree(node))
+        next_node = min([node for node in pattern.nodes if node not in earlier], key=priority)
+        estimate = next_estimate(next_node)
+        add_step(next_node, estimate, False)
+    return MatchPlan(steps)
+
+def plan_matching(pattern: DiGraph, graph_stats: GraphStatistics, first: Iterable[NodeName] = ()) -> MatchPlan:
+    """Plan the order in which the pattern nodes are matched, so that the search goes through as few partial matches as possible.
+    The number of partial matches after each step is estimated from the statistics of the graph, assuming that attributes
+    and edges are independent. Every node is tried as the anchor (the first node), and the plan continues greedily from it.
+
+    Args:
+        pattern (DiGraph): A pattern graph produced by the LHS Parser.
+        graph_stats (GraphStatistics): Statistics of the graph to search.
+        first (Iterable[NodeName], optional): Pattern nodes whose match is known in advance, which are put at the beginning of the plan
+            (instead of an anchor). Defaults to no such nodes.
+
+    Returns:
+        MatchPlan: The plan with the lowest estimated cost. `MatchPlan.explain` prints it.
+    """
+    first = list(first)
+    if len(first) > 0 or len(pattern.nodes) == 0:
+        return _plan_from(pattern, graph_stats, first, fixed=True)
+    return min((_plan_from(pattern, graph_stats, [anchor], fixed=False) for anchor in pattern.nodes), key=lambda plan: plan.cost)
+
+# %% ../nbs/03_matcher.ipynb 24
+def _checks_constraints_only(pattern: DiGraph, condition: Callable) -> bool:
+    """Whether a condition only checks the value constraints of the pattern, as `lhs_to_graph` builds it without a user condition.
+    The search checks these constraints anyway, so such a condition holds for every mapping it finds, and can't tell apart
+    mappings which differ only in their anonymous nodes."""
+    return isinstance(condition, partial) and condition.func is _type_condition and condition.args[1] is None and \
+        list(condition.args[0]) == list(pattern.graph.get('constraints', []))
+
+def _existential_order(pattern: DiGraph, first: Iterable[NodeName] = (), graph_stats: GraphStatistics = None
+                       ) -> Tuple[list[NodeName], int]:
+    """Order the pattern nodes for a search which needs a single mapping of the anonymous nodes (a witness) for every mapping
+    of the other nodes. The named nodes (and the given first nodes) are ordered before the anonymous ones, unless only the
+    anonymous nodes connect them (searching `a->_->b` from `a` and `b` would go through all the pairs of graph nodes).
+
+    Args:
         pattern (DiGraph): A pattern graph produced by the LHS Parser.
+        first (Iterable[NodeName], optional): Pattern nodes to put at the beginning of the order. Defaults to no such nodes.
+        graph_stats (GraphStatistics, optional): Statistics of the input graph, from which the order is planned. Defaults to None.
 
     Returns:
-        bool: True if the isomorphic graph matches the pattern, False otherwise.
+        Tuple[list[NodeName], int]: The order, and the number of steps at its beginning for which every mapping is searched.
+            Only anonymous nodes (which are not first) come after these steps, so a single witness of them is needed.
     """
+    first = list(first)
+    enumerated = set(first) | {node for node in pattern.nodes if not is_anonymous_node(node)}
+    components = {node: i for i, component in enumerate(nx.weakly_connected_components(pattern)) for node in component}
+    named = pattern.subgraph(enumerated)
+    if nx.number_weakly_connected_components(named) == len({components[node] for node in enumerated}):
+        order = _match_order(pattern, _match_order(named, first, graph_stats), graph_stats)
+    else:
+        order = _match_order(pattern, first, graph_stats)
+    return order, max((i + 1 for i, node in enumerate(order) if node in enumerated), default=0)
+
+# %% ../nbs/03_matcher.ipynb 27
+def _constraints_of(pattern: DiGraph) -> dict[Union[NodeName, EdgeName], frozenset]:
+    # The constraints of every pattern node and edge, comparable between elements (checks are partials of module functions)
+    constraints = {}
+    for element, attr_name, check in pattern.graph.get('constraints', []):
+        key = (attr_name, check.func, check.args) if isinstance(check, partial) else (attr_name, check)
+        constraints[element] = constraints.get(element, frozenset()) | {key}
+    return constraints
 
-    # check nodes match
-    subgraph, mapping = isom
-    if not all([_attributes_exist(subgraph.nodes[original_node], pattern.nodes[pattern_node]) \
-                for (pattern_node, original_node) in mapping.items()]):
+def _are_twins(pattern: DiGraph, constraints: dict, u: NodeName, v: NodeName) -> bool:
+    # Whether swapping u and v maps the pattern onto itself (with the same attributes and constraints)
+    def same(element1, element2, attrs1: dict, attrs2: dict) -> bool:
+        return attrs1 == attrs2 and constraints.get(element1) == constraints.get(element2)
+    swap = {u: v, v: u}
+    if not same(u, v, pattern.nodes[u], pattern.nodes[v]):
         return False
+    for src, dst, attrs in itertools.chain(pattern.out_edges(u, data=True), pattern.in_edges(u, data=True)):
+        swapped = (swap.get(src, src), swap.get(dst, dst))
+        if not pattern.has_edge(*swapped) or not same((src, dst), swapped, attrs, pattern.edges[swapped]):
+            return False
+    return pattern.degree(u) == pattern.degree(v)
+
+def _twin_classes(pattern: DiGraph, condition: Callable) -> list[list[NodeName]]:
+    """Find the classes of interchangeable anonymous pattern nodes: nodes that can be swapped without changing the pattern
+    (they have the same attributes, constraints and neighbors). Swapping the graph nodes mapped to two such nodes gives another
+    mapping of the same match, as anonymous nodes aren't part of it, so only the mapping in which the graph nodes of every class
+    are ordered needs to be searched for.
+
+    This holds only if the condition doesn't look at the anonymous nodes, so the classes are found only for conditions that check
+    just the constraints of the pattern (as `lhs_to_graph` builds without a user condition).
+
+    Args:
+        pattern (DiGraph): A pattern graph produced by the LHS Parser.
+        condition (Callable): The condition of the search
+
+    Returns:
+        list[list[NodeName]]: The classes with more than one node, each in the order of the pattern nodes.
+    """
+    if not _checks_constraints_only(pattern, condition):
+        return []
+    constraints = _constraints_of(pattern)
+    classes: list[list[NodeName]] = []
+    for node in pattern.nodes:
+        if not is_anonymous_node(node):
+            continue
+        for twin_class in classes:
+            if _are_twins(pattern, constraints, twin_class[0], node):
+                twin_class.append(node)
+                break
+        else:
+            classes.append([node])
+    return [twin_class for twin_class in classes if len(twin_class) > 1]
+
+def _twin_bounds(twins: list[list[NodeName]]) -> dict[NodeName, Tuple[Optional[NodeName], Optional[NodeName]]]:
+    # Every node of a class is mapped after its previous node and before its next node, so the whole class is ordered
+    bounds = {}
+    for twin_class in twins:
+        for i, node in enumerate(twin_class):
+            bounds[node] = (twin_class[i - 1] if i > 0 else None, twin_class[i + 1] if i + 1 < len(twin_class) else None)
+    return bounds
+
+def _precedes(graph_node1: NodeName, graph_node2: NodeName) -> bool:
+    # Only names of the same type, strings or integers, are ordered. Others are left in every order, which only keeps duplicates
+    if type(graph_node1) is type(graph_node2) and type(graph_node1) in (str, int):
+        return graph_node1 < graph_node2
+    return True
+
+# %% ../nbs/03_matcher.ipynb 30
+def _find_mappings(graph: DiGraph, pattern: DiGraph,
+                   node_match: Callable[[NodeName, dict], bool] = lambda pattern_node, attrs: True,
+                   edge_match: Callable[[NodeName, NodeName, dict], bool] = lambda pattern_src, pattern_dst, attrs: True,
+                   fixed: dict[NodeName, NodeName] = None,
+                   index: AttributeIndex = None,
+                   graph_stats: GraphStatistics = None,
+                   twins: list[list[NodeName]] = None,
+                   existential: bool = False
+                   ) -> Iterator[dict[NodeName, NodeName]]:
+    """Given a graph, find all the injective mappings of the pattern nodes to the graph nodes,
+    such that every pattern edge is mapped to a graph edge, and the mapped nodes and edges satisfy the given predicates.
+    Without predicates, these are all the subgraphs which have the same structure as the pattern (ignoring attributes).
+
+    Args:
+        graph (DiGraph): A graph to find matches in
+        pattern (DiGraph): A pattern graph produced by the LHS Parser.
+        node_match (Callable[[NodeName, dict], bool], optional): Decides whether a graph node (given by its attributes)
+            can be mapped to a pattern node. Defaults to a predicate which always holds.
+        edge_match (Callable[[NodeName, NodeName, dict], bool], optional): Decides whether a graph edge (given by its attributes)
+            can be mapped to a pattern edge (given by its endpoints). Defaults to a predicate which always holds.
+        fixed (dict[NodeName, NodeName], optional): Pattern nodes which may be mapped only to the given graph nodes,
+            which restricts the search to the mappings around these nodes. Defaults to None (no restriction).
+        index (AttributeIndex, optional): An attribute index of the graph, from which the candidates of pattern nodes without
+            matched neighbors are taken. Defaults to None (all the graph nodes are their candidates).
+        graph_stats (GraphStatistics, optional): Statistics of the graph, from which the order of the search is planned. Defaults to None.
+        twins (list[list[NodeName]], optional): Classes of interchangeable anonymous pattern nodes (see `_twin_classes`), which are mapped
+            only to graph nodes in increasing order. Defaults to None.
+        existential (bool, optional): If True, a single mapping of the anonymous pattern nodes (other than the fixed ones) is searched for
+            every mapping of the other nodes (see `_existential_order`). Defaults to False.
+
+    Yields:
+        Iterator[dict[NodeName, NodeName]]: Iterator of mappings, each maps the pattern nodes to the graph nodes
+            that match them.
+    """
+    fixed = fixed if fixed else {}
+    order, witness_step = _existential_order(pattern, fixed.keys(), graph_stats) if existential else \
+        (_match_order(pattern, fixed.keys(), graph_stats), len(pattern.nodes))
+    plan = _search_plan(pattern, order)
+    mapping: dict[NodeName, NodeName] = {}
+    used: set[NodeName] = set()
+    bounds = _twin_bounds(twins) if twins else {}
+    # The candidates of the pattern nodes which begin a connected part of the pattern, according to the index
+    seeds = {} if index is None else \
+        {pattern_node: _index_candidates(index, pattern, pattern_node) for pattern_node, out_to, in_from, _ in plan
+         if not out_to and not in_from and pattern_node not in fixed}
+
+    def candidates(pattern_node: NodeName, out_to: list[NodeName], in_from: list[NodeName]) -> Iterable[NodeName]:
+        if pattern_node in fixed:
+            return [fixed[pattern_node]] if fixed[pattern_node] in graph else []
+        # Neighbors of matched nodes (predecessors for out-edges, successors for in-edges), the smallest set wins
+        neighborhoods = [graph.pred[mapping[target]] for target in out_to] + \
+                        [graph.succ[mapping[src]] for src in in_from]
+        if len(neighborhoods) == 0:
+            return graph.nodes if seeds.get(pattern_node) is None else seeds[pattern_node]
+        return min(neighborhoods, key=len)
 
-    # check edges match
-    if all([_attributes_exist(subgraph.edges[mapping[edge[0]], mapping[edge[1]]], edge[2]) \
-                for edge in pattern.edges(data=True)]):
+    def edges_match(graph_node: NodeName, pattern_node: NodeName, out_to: list[NodeName], in_from: list[NodeName], self_loop: bool) -> bool:
+        # The edges between the candidate and the nodes matched so far (including a self loop) must exist and match
+        out_edges, in_edges = graph.succ[graph_node], graph.pred[graph_node]
+        if self_loop and not (graph_node in out_edges and edge_match(pattern_node, pattern_node, out_edges[graph_node])):
+            return False
+        for target in out_to:
+            if mapping[target] not in out_edges or not edge_match(pattern_node, target, out_edges[mapping[target]]):
+                return False
+        for src in in_from:
+            if mapping[src] not in in_edges or not edge_match(src, pattern_node, in_edges[mapping[src]]):
+                return False
         return True
 
-# %% ../nbs/03_matcher.ipynb 16
+    def extend(step: int):
+        if step == len(plan):
+            yield dict(mapping)
+        elif step == witness_step:
+            # Only anonymous nodes are left, and a single mapping of them is needed
+            witnesses = extend_from(step)
+            witness = next(witnesses, None)
+            witnesses.close()
+            if witness is not None:
+                # The search was stopped at the witness, so its nodes are still mapped
+                for pattern_node, *_ in plan[step:]:
+                    used.remove(mapping.pop(pattern_node))
+                yield witness
+        else:
+            yield from extend_from(step)
+
+    def extend_from(step: int):
+        pattern_node, out_to, in_from, self_loop = plan[step]
+        lower, upper = bounds.get(pattern_node, (None, None))
+        lower, upper = mapping.get(lower), mapping.get(upper)
+        for graph_node in candidates(pattern_node, out_to, in_from):
+            if graph_node in used or not node_match(pattern_node, graph.nodes[graph_node]) or \
+                    not edges_match(graph_node, pattern_node, out_to, in_from, self_loop):
+                continue
+            if (lower is not None and not _precedes(lower, graph_node)) or (upper is not None and not _precedes(graph_node, upper)):
+                continue
+            mapping[pattern_node] = graph_node
+            used.add(graph_node)
+            yield from extend(step + 1)
+            used.remove(graph_node)
+            del mapping[pattern_node]
+
+    yield from extend(0)
+
+# %% ../nbs/03_matcher.ipynb 32
+_compact_snapshots = weakref.WeakKeyDictionary() # Snapshots of frozen graphs, which can't change
+
+class _CompactGraph:
+    """A read-only snapshot of the structure of a graph, for the structural search. The nodes are numbered by their order
+    in the graph, the adjacency is kept in CSR arrays (the sorted neighbors of node `i` are `idx[ptr[i]:ptr[i + 1]]`),
+    and the attribute names of every node are kept as a bitmask."""
+    def __init__(self, graph: DiGraph):
+        self.graph = graph
+        self.names: list[NodeName] = list(graph.nodes)
+        self.index: dict[NodeName, int] = {name: i for i, name in enumerate(self.names)}
+        self.out_ptr, self.out_idx = self._csr(graph.succ)
+        self.in_ptr, self.in_idx = self._csr(graph.pred)
+        self.attr_bits: dict[Hashable, int] = {}
+        masks = []
+        for name in self.names:
+            mask = 0
+            for attr_name in graph.nodes[name]:
+                mask |= self.attr_bits.setdefault(attr_name, 1 << len(self.attr_bits))
+            masks.append(mask)
+        self.masks = array('Q', masks) if len(self.attr_bits) <= 64 else masks
+
+    def _csr(self, adjacency) -> Tuple[array, array]:
+        ptr, idx = array('q', [0]), array('i' if len(self.names) < 2 ** 31 else 'q')
+        for name in self.names:
+            idx.extend(sorted(self.index[neighbor] for neighbor in adjacency[name]))
+            ptr.append(len(idx))
+        return ptr, idx
+
+    @staticmethod
+    def of(graph: DiGraph) -> '_CompactGraph':
+        """A snapshot of the graph. Snapshots of frozen graphs (see `networkx.freeze`) are cached, as long as the graph exists."""
+        if not nx.is_frozen(graph):
+            return _CompactGraph(graph)
+        if graph not in _compact_snapshots:
+            _compact_snapshots[graph] = _CompactGraph(graph)
+        return _compact_snapshots[graph]
+
+    def has_edge(self, src: int, dst: int) -> bool:
+        low, high = self.out_ptr[src], self.out_ptr[src + 1]
+        i = bisect_left(self.out_idx, dst, low, high)
+        return i < high and self.out_idx[i] == dst
+
+    def attrs_mask(self, attr_names: Iterable[Hashable]) -> Optional[int]:
+        """The mask of the given attribute names, or None if some name isn't an attribute of any node."""
+        mask = 0
+        for attr_name in attr_names:
+            if attr_name not in self.attr_bits:
+                return None
+            mask |= self.attr_bits[attr_name]
+        return mask
+
+# %% ../nbs/03_matcher.ipynb 34
+def _find_mappings_compact(compact: _CompactGraph, pattern: DiGraph,
+                           node_match: Callable[[NodeName, dict], bool] = lambda pattern_node, attrs: True,
+                           edge_match: Callable[[NodeName, NodeName, dict], bool] = lambda pattern_src, pattern_dst, attrs: True,
+                           graph_stats: GraphStatistics = None,
+                           twins: list[list[NodeName]] = None,
+                           existential: bool = False
+                           ) -> Iterator[dict[NodeName, NodeName]]:
+    """Find the same mappings as `_find_mappings` (possibly in a different order), using a compact snapshot of the graph.
+    The predicates are called only for the pattern nodes and edges which have value constraints or required attributes
+    (for nodes, the required attributes are checked with the bitmasks).
+
+    Args:
+        compact (_CompactGraph): A snapshot of the graph to find matches in
+        pattern (DiGraph): A pattern graph produced by the LHS Parser.
+        node_match (Callable[[NodeName, dict], bool], optional): The node predicate of the pattern. Defaults to a predicate which always holds.
+        edge_match (Callable[[NodeName, NodeName, dict], bool], optional): The edge predicate of the pattern. Defaults to a predicate which always holds.
+        graph_stats (GraphStatistics, optional): Statistics of the graph, from which the order of the search is planned. Defaults to None.
+        twins (list[list[NodeName]], optional): Classes of interchangeable anonymous pattern nodes, which are mapped only to graph nodes
+            in increasing order (of their numbers in the snapshot). Defaults to None.
+        existential (bool, optional): If True, a single mapping of the anonymous pattern nodes is searched for every mapping of the
+            other nodes. Defaults to False.
+
+    Yields:
+        Iterator[dict[NodeName, NodeName]]: Iterator of mappings, each maps the pattern nodes to the graph nodes that match them.
+    """
+    graph, names = compact.graph, compact.names
+    out_ptr, out_idx, in_ptr, in_idx, masks = compact.out_ptr, compact.out_idx, compact.in_ptr, compact.in_idx, compact.masks
+    constrained = {element for element, _, _ in pattern.graph.get('constraints', [])}
+
+    bounds = _twin_bounds(twins) if twins else {}
+
+    order, witness_step = _existential_order(pattern, graph_stats=graph_stats) if existential else \
+        (_match_order(pattern, graph_stats=graph_stats), len(pattern.nodes))
+
+    # The search plan, with what should be checked at every step
+    steps = []
+    for pattern_node, out_to, in_from, self_loop in _search_plan(pattern, order):
+        required_mask = compact.attrs_mask(pattern.nodes[pattern_node])
+        if required_mask is None:
+            return # No graph node has all the required attributes
+        checked_edges = [(pattern_node, target) for target in out_to if pattern.edges[pattern_node, target] or (pattern_node, target) in constrained] + \
+                        [(src, pattern_node) for src in in_from if pattern.edges[src, pattern_node] or (src, pattern_node) in constrained]
+        if self_loop and (pattern.edges[pattern_node, pattern_node] or (pattern_node, pattern_node) in constrained):
+            checked_edges.append((pattern_node, pattern_node))
+        steps.append((pattern_node, out_to, in_from, self_loop, required_mask, pattern_node in constrained, checked_edges,
+                      *bounds.get(pattern_node, (None, None))))
+
+    mapping: dict[NodeName, int] = {}
+    used = bytearray(len(names))
+
+    def has_edge(src: int, dst: int) -> bool:
+        low, high = out_ptr[src], out_ptr[src + 1]
+        i = bisect_left(out_idx, dst, low, high)
+        return i < high and out_idx[i] == dst
+
+    def extend(step: int):
+        if step == len(steps):
+            yield {pattern_node: names[graph_node] for pattern_node, graph_node in mapping.items()}
+        elif step == witness_step:
+            # Only anonymous nodes are left, and a single mapping of them is needed
+            witnesses = extend_from(step)
+            witness = next(witnesses, None)
+            witnesses.close()
+            if witness is not None:
+                # The search was stopped at the witness, so its nodes are still mapped
+                for pattern_node, *_ in steps[step:]:
+                    used[mapping.pop(pattern_node)] = 0
+                yield witness
+        else:
+            yield from extend_from(step)
+
+    def extend_from(step: int):
+        pattern_node, out_to, in_from, self_loop, required_mask, is_constrained, checked_edges, lower, upper = steps[step]
+        low_bound, high_bound = mapping.get(lower, -1), mapping.get(upper, len(names))
+        # Neighbors of matched nodes (predecessors for out-edges, successors for in-edges), the smallest set wins
+        candidates, smallest = range(len(names)), None
+        for neighbors, ptr, matched in [(in_idx, in_ptr, mapping[target]) for target in out_to] + \
+                                       [(out_idx, out_ptr, mapping[src]) for src in in_from]:
+            low, high = ptr[matched], ptr[matched + 1]
+            if smallest is None or high - low < smallest:
+                candidates, smallest = neighbors[low:high], high - low
+        for graph_node in candidates:
+            if used[graph_node] or not low_bound < graph_node < high_bound or (masks[graph_node] & required_mask) != required_mask or \
+                    (is_constrained and not node_match(pattern_node, graph.nodes[names[graph_node]])):
+                continue
+            # The edges to the nodes matched so far must exist (plain loops, as this is the innermost part of the search)
+            if self_loop and not has_edge(graph_node, graph_node):
+                continue
+            for target in out_to:
+                if not has_edge(graph_node, mapping[target]):
+                    break
+            else:
+                for src in in_from:
+                    if not has_edge(mapping[src], graph_node):
+                        break
+                else:
+                    mapping[pattern_node] = graph_node
+                    # The attributes of edges are checked only when the pattern edge requires some
+                    if not checked_edges or \
+                            all(edge_match(src, dst, graph.succ[names[mapping[src]]][names[mapping[dst]]]) for src, dst in checked_edges):
+                        used[graph_node] = 1
+                        yield from extend(step + 1)
+                        used[graph_node] = 0
+                    del mapping[pattern_node]
+
+    yield from extend(0)
+
+# %% ../nbs/03_matcher.ipynb 36
+_worker_search = None # The graph, pattern and predicates of the search, in a worker process
+
+def _init_search_worker(graph: DiGraph, pattern: DiGraph, graph_stats: GraphStatistics = None, twins: list[list[NodeName]] = None,
+                        existential: bool = False):
+    global _worker_search
+    _worker_search = (graph, pattern, graph_stats, twins, existential, *_pattern_predicates(pattern))
+
+def _search_anchored(anchor: NodeName, candidates: list[NodeName]) -> list[dict[NodeName, NodeName]]:
+    graph, pattern, graph_stats, twins, existential, node_match, edge_match = _worker_search
+    return [mapping for candidate in candidates
+            for mapping in _find_mappings(graph, pattern, node_match, edge_match, fixed={anchor: candidate},
+                                                  graph_stats=graph_stats, twins=twins, existential=existential)]
+
+def _find_mappings_in_workers(graph: DiGraph, pattern: DiGraph, workers: int,
+                              node_match: Callable[[NodeName, dict], bool] = lambda pattern_node, attrs: True,
+                              graph_stats: GraphStatistics = None,
+                              twins: list[list[NodeName]] = None,
+                              existential: bool = False
+                              ) -> Iterator[dict[NodeName, NodeName]]:
+    """Find the same mappings as `_find_mappings`, by splitting the search between worker processes on the candidates of the most
+    selective pattern node (the anchor). The mappings are in the same order if the anchor is the first node of the serial search,
+    which is always the case with statistics of the graph. The predicates of the pattern are built by every worker from the pattern itself.
+
+    Args:
+        graph (DiGraph): A graph to find matches in
+        pattern (DiGraph): A pattern graph produced by the LHS Parser.
+        workers (int): The number of worker processes
+        node_match (Callable[[NodeName, dict], bool], optional): The node predicate of the pattern, used for choosing the anchor and finding
+            its candidates.
+        graph_stats (GraphStatistics, optional): Statistics of the graph, from which the order of the search (and its anchor) is planned.
+            Defaults to None.
+        twins (list[list[NodeName]], optional): Classes of interchangeable anonymous pattern nodes, which are mapped only to graph nodes
+            in increasing order. Defaults to None.
+        existential (bool, optional): If True, a single mapping of the anonymous pattern nodes (other than the anchor) is searched for
+            every mapping of the other nodes. Defaults to False.
+
+    Yields:
+        Iterator[dict[NodeName, NodeName]]: Iterator of mappings, each maps the pattern nodes to the graph nodes that match them.
+    """
+    order, enumerated = _existential_order(pattern, graph_stats=graph_stats) if existential else \
+        (_match_order(pattern, graph_stats=graph_stats), len(pattern.nodes))
+    if graph_stats is not None:
+        # The planned order begins with the most selective node
+        anchor = order[0]
+        candidates = [node for node, attrs in graph.nodes(data=True) if node_match(anchor, attrs)]
+    else:
+        # The pattern node with the fewest candidates (ties are broken by the order of the search). Nodes which require nothing
+        # accept every graph node, so only the others are checked. The anonymous nodes which need only a witness aren't anchors
+        anchor, candidates = order[0], list(graph.nodes)
+        constrained = {element for element, _, _ in pattern.graph.get('constraints', [])}
+        for pattern_node in order[:max(enumerated, 1)]:
+            if pattern.nodes[pattern_node] or pattern_node in constrained:
+                node_candidates = [node for node, attrs in graph.nodes(data=True) if node_match(pattern_node, attrs)]
+                if len(node_candidates) < len(candidates):
+                    anchor, candidates = pattern_node, node_candidates
+    # A few chunks per worker, so that the work is balanced even if some candidates have many more mappings than others
+    chunk_size = max(1, math.ceil(len(candidates) / (workers * 4)))
+    chunks = (candidates[i:i + chunk_size] for i in range(0, len(candidates), chunk_size))
+
+    executor = ProcessPoolExecutor(workers, initializer=_init_search_worker, initargs=(graph, pattern, graph_stats, twins, existential))
+    try:
+        # Keep a bounded window of chunks in flight (so a search which stops early doesn't search them all), and yield the mappings in order
+        in_flight = deque(executor.submit(_search_anchored, anchor, chunk) for chunk in itertools.islice(chunks, workers * 2))
+        while in_flight:
+            mappings = in_flight.popleft().result()
+            for chunk in itertools.islice(chunks, 1):
+                in_flight.append(executor.submit(_search_anchored, anchor, chunk))
+            yield from mappings
+    finally:
+        # The iteration might stop early, in which case the remaining chunks are not needed
+        executor.shutdown(cancel_futures=True)
+
+# %% ../nbs/03_matcher.ipynb 38
+def _first_injective(used: set[NodeName], groups: list[list[dict[NodeName, NodeName]]]) -> Optional[list[dict[NodeName, NodeName]]]:
+    # A mapping from every group, such that no graph node is used twice (and none of the used nodes is), or None if there is none
+    if len(groups) == 0:
+        return []
+    for mapping in groups[0]:
+        nodes = set(mapping.values())
+        if used.isdisjoint(nodes):
+            rest = _first_injective(used | nodes, groups[1:])
+            if rest is not None:
+                return [mapping, *rest]
+    return None
+
+def _join_mappings(first: Iterable[dict[NodeName, NodeName]], rest: list[Iterable[dict[NodeName, NodeName]]],
+                   key: Callable[[dict[NodeName, NodeName]], Hashable] = None) -> Iterator[dict[NodeName, NodeName]]:
+    """Join the mappings of the components of a pattern: every mapping of the first component is combined with every
+    combination of mappings of the other components, in which no two pattern nodes are mapped to the same graph node.
+    The mappings of the first component are taken lazily, while those of the other components are found once
+    (when the first mapping is joined) and kept.
+
+    Args:
+        first (Iterable[dict[NodeName, NodeName]]): The mappings of the first component
+        rest (list[Iterable[dict[NodeName, NodeName]]]): The mappings of every other component
+        key (Callable[[dict[NodeName, NodeName]], Hashable], optional): If given, only a single combination (the first which is injective)
+            is joined for every combination of the keys of the mappings (e.g. their named nodes). Defaults to None (every combination).
+
+    Yields:
+        Iterator[dict[NodeName, NodeName]]: The joined mappings.
+    """
+    groups, joined = None, set()
+    for mapping in first:
+        if groups is None:
+            # The mappings of every other component, grouped by their keys (without a key, every mapping is a group of its own)
+            groups = []
+            for mappings in rest:
+                grouped = {}
+                for i, component_mapping in enumerate(mappings):
+                    grouped.setdefault(key(component_mapping) if key is not None else i, []).append(component_mapping)
+                groups.append(list(grouped.items()))
+            if not all(groups):
+                return
+        first_key, used = key(mapping) if key is not None else None, set(mapping.values())
+        for combination in itertools.product(*groups):
+            combination_key = (first_key, *(group_key for group_key, _ in combination))
+            if key is not None and combination_key in joined:
+                continue
+            component_mappings = _first_injective(used, [group for _, group in combination])
+            if component_mappings is not None:
+                if key is not None:
+                    joined.add(combination_key)
+                joined_mapping = dict(mapping)
+                for component_mapping in component_mappings:
+                    joined_mapping.update(component_mapping)
+                yield joined_mapping
+
+# %% ../nbs/03_matcher.ipynb 41
+def _component_pattern(pattern: DiGraph, nodes: Collection[NodeName]) -> DiGraph:
+    # The pattern graph of a component, with its own constraints (so the predicates can be built from it, e.g. by worker processes)
+    component = pattern.subgraph(nodes).copy()
+    component.graph['constraints'] = [(element, attr_name, check) for element, attr_name, check in pattern.graph.get('constraints', [])
+                                      if (element[0] if type(element) is tuple else element) in nodes]
+    return component
+
+def _search_mappings(input_graph: DiGraph, pattern: DiGraph, node_match: Callable, edge_match: Callable,
+                     fixed: dict[NodeName, NodeName] = None, workers: int = None, compact: bool = False, index: AttributeIndex = None,
+                     graph_stats: GraphStatistics = None, twins: list[list[NodeName]] = None, existential: bool = False
+                     ) -> Iterator[dict[NodeName, NodeName]]:
+    """Find the mappings of a pattern, with the search which the arguments select (see `find_matches`). The components of a pattern
+    which isn't connected are searched separately, and their mappings are joined (see `_join_mappings`).
+
+    Args:
+        input_graph (DiGraph): A graph to find matches in
+        pattern (DiGraph): A pattern graph produced by the LHS Parser.
+        node_match (Callable): The node predicate of the pattern.
+        edge_match (Callable): The edge predicate of the pattern.
+        fixed (dict[NodeName, NodeName], optional): Pattern nodes which may be mapped only to the given graph nodes (the search is then
+            neither split between workers nor run over a compact snapshot). Defaults to None.
+        workers (int, optional): If given, the search is split between this number of worker processes. Defaults to None.
+        compact (bool, optional): If True, the search runs over a compact snapshot of the input graph. Defaults to False.
+        index (AttributeIndex, optional): An attribute index of the input graph, which the search takes candidates from. Defaults to None.
+        graph_stats (GraphStatistics, optional): Statistics of the input graph, from which the order of the search is planned. Defaults to None.
+        twins (list[list[NodeName]], optional): Classes of interchangeable anonymous pattern nodes. Defaults to None.
+        existential (bool, optional): If True, a single mapping of the anonymous nodes is searched for every mapping of the other nodes.
+            Defaults to False.
+
+    Returns:
+        Iterator[dict[NodeName, NodeName]]: Iterator of mappings, each maps the pattern nodes to the graph nodes that match them.
+    """
+    components = list(nx.weakly_connected_components(pattern))
+    if len(components) > 1:
+        # The components are joined in the order in which the search would have reached them
+        position = {node: i for i, node in enumerate(_match_order(pattern, fixed.keys() if fixed else (), graph_stats))}
+        components.sort(key=lambda component: min(position[node] for node in component))
+        # The anonymous nodes of a component are searched in full, as a witness might use a node of another component,
+        # and a single witness is joined for the named nodes instead
+        searches = [_search_mappings(input_graph, _component_pattern(pattern, component), node_match, edge_match,
+                                     {node: fixed[node] for node in component if node in fixed} if fixed else None,
+                                     workers, compact, index, graph_stats,
+                                     [[node for node in twin_class if node in component] for twin_class in twins or []])
+                    for component in components]
+        key = (lambda mapping: frozenset((node, graph_node) for node, graph_node in mapping.items() if not is_anonymous_node(node))) \
+            if existential else None
+        return _join_mappings(searches[0], searches[1:], key)
+
+    if workers and not fixed and len(pattern.nodes) > 0:
+        return _find_mappings_in_workers(input_graph, pattern, workers, node_match, graph_stats, twins, existential)
+    elif compact and not fixed:
+        return _find_mappings_compact(_CompactGraph.of(input_graph), pattern, node_match, edge_match, graph_stats, twins, existential)
+    return _find_mappings(input_graph, pattern, node_match, edge_match, fixed, index, graph_stats, twins, existential)
+
+# %% ../nbs/03_matcher.ipynb 44
 FilterFunc = Callable[[Match], bool]
 
-# %% ../nbs/03_matcher.ipynb 19
-def _remove_duplicated_matches(matches: list[Match]) -> Match:
-    """Remove duplicates from a list of Matches, based on their mappings. Return an iterator of the matches without duplications.
+# %% ../nbs/03_matcher.ipynb 47
+def _remove_duplicated_matches(matches: Iterable[Match], stats: RewriteStats = None) -> Iterator[Match]:
+    """Remove duplicates from an iterable of Matches, based on their mappings. Return an iterator of the matches without duplications.
 
     Args:
-        matches (list[Match]): list of Match objects
+        matches (Iterable[Match]): Match objects (possibly a lazy iterator)
+        stats (RewriteStats, optional): If given, the duplicates are counted in it. Defaults to None.
 
     Yields:
-        Iterator[list[Match]]: Iterator of the matches without duplications.
+        Iterator[Match]: Iterator of the matches without duplications.
     """
-    new_list = []
+    seen_keys = set()
     for match in matches:
-        if match not in new_list:
-            new_list.append(match)
+        match_key = match.key()
+        if match_key not in seen_keys:
+            seen_keys.add(match_key)
             yield match
+        elif stats is not None:
+            stats.count("duplicates")
 
-# %% ../nbs/03_matcher.ipynb 21
-def find_matches(input_graph: DiGraph, pattern: DiGraph, condition: FilterFunc = lambda match: True) -> Match:
+# %% ../nbs/03_matcher.ipynb 49
+def _instrument_search(stats: Optional[RewriteStats], node_match: Callable, edge_match: Callable, condition: FilterFunc
+                       ) -> Tuple[Callable, Callable, FilterFunc]:
+    """Wrap the predicates and the condition of a search, so that their calls are timed and counted in the given stats
+    (every call of the node predicate examines a candidate). Without stats, they are returned as they are."""
+    if stats is None:
+        return node_match, edge_match, condition
+    return (stats.timed_func(node_match, "attribute_filter", counter="candidates"),
+            stats.timed_func(edge_match, "attribute_filter"),
+            stats.timed_func(condition, "condition", rejected="rejected_by_condition"))
+
+def _instrument_mappings(stats: Optional[RewriteStats], mappings: Iterator[dict]) -> Iterator[dict]:
+    # The time of the search itself is the time it takes to produce the mappings
+    return stats.timed_iter(mappings, "search", counter="mappings") if stats is not None else mappings
+
+# %% ../nbs/03_matcher.ipynb 51
+def find_matches(input_graph: DiGraph, pattern: DiGraph, condition: FilterFunc = lambda match: True, workers: int = None,
+                 stats: RewriteStats = None, compact: bool = False, index: AttributeIndex = None,
+                 graph_stats: GraphStatistics = None, limit: int = None) -> Match:
     """Find all matches of a pattern graph in an input graph, for which a certain condition holds.
     That is, subgraphs of the input graph which have the same nodes, edges, attributes and required attribute values
     as the pattern defines, which satisfy any additional condition the user defined.
 
+    The matches are found lazily: each match is yielded as soon as it is found, so taking only the first match
+    does not require finding all of them. Therefore, the input graph should not be changed while iterating.
+
     Args:
         input_graph (DiGraph): A graph to find matches in
         pattern (DiGraph): A pattern graph produced by the LHS Parser.
         condition (FilterFunc, optional): A function which recives a Match objects, and checks whether some condition holds
             for the corresponding match. Defaults to a condition function which always returns True.
+        workers (int, optional): If given, the search is split between this number of worker processes. The matches are the same as
+            those of the serial search, but their order might differ (see `_find_mappings_in_workers`). Defaults to None (a serial search).
+        stats (RewriteStats, optional): If given, the search is timed and counted in it (the predicates which run in worker processes
+            are not). Defaults to None.
+        compact (bool, optional): If True (and there are no workers), the search runs over a compact snapshot of the input graph.
+            The matches are the same, but their order might differ, and fewer candidates are counted in the stats (see `RewriteStats`).
+            Defaults to False.
+        index (AttributeIndex, optional): An attribute index of the input graph, which the search takes candidates from (unless it's split
+            between workers or runs over a compact snapshot). The matches are the same, but their order might differ. Defaults to None.
+        graph_stats (GraphStatistics, optional): Statistics of the input graph, from which the order of the search is planned
+            (see `plan_matching`). The matches are the same, but their order might differ. Defaults to None.
+        limit (int, optional): If given, at most this number of matches are found, and the search stops once they are. Defaults to None.
 
     Yields:
         Iterator[Match]: Iterator of Match objects (without duplications), each corresponds to a match of the pattern in the input graph.
     """
 
-    # Narrow down search space by keeping only input-graph nodes that have the same attributes as some pattern node
-    matching_nodes = [n for (n, attrs) in input_graph.nodes(data=True) if _does_node_match_pattern(attrs, pattern)]
-    # Reducing the input graph to the matching nodes + connected edges
-    reduced_input_g = input_graph.subgraph(matching_nodes)
-    
-    # Find all structural matches (isomorphisms), ignore attributes
-    isom_matches =  [match for match in _find_structural_matches(reduced_input_g, pattern)]
-    # Find matches with attributes among isoms (match pattern's attributes)
-    attribute_matches = [mapping for (subgraph, mapping) in isom_matches if _does_isom_match_pattern((subgraph, mapping), pattern)]
+    # Find all matches in terms of structure, attributes and value constraints (the latter are checked during the search),
+    # mapping interchangeable anonymous nodes in one order only. Without a user condition, a single mapping of the anonymous nodes
+    # is needed for every match, and there is nothing left for the condition to check
+    twins = _twin_classes(pattern, condition)
+    existential = _checks_constraints_only(pattern, condition)
+    node_match, edge_match, condition = _instrument_search(stats, *_pattern_predicates(pattern), condition)
+    mappings = _search_mappings(input_graph, pattern, node_match, edge_match, None, workers, compact, index, graph_stats, twins,
+                                existential)
+    mappings = _instrument_mappings(stats, mappings)
 
-    # construct a list of Match objects. Note that the condition is checked on a Match that includes anonymous nodes (as it might use it)
+    # The condition is checked on a Match that includes anonymous nodes (as it might use it),
     # but the Match that we return does not include the anonymous parts.
-    # Therefore, we first construct a list of tuples - the first is the mapping with anonymous, the second isn't
-    matches_list = [(mapping_to_match(input_graph, pattern, mapping, filter=False), mapping_to_match(input_graph, pattern, mapping)) 
-                    for mapping in attribute_matches]
-    # Then filter the list, to contain only the filtered match whose unfiltered version matches the condition
-    filtered_matches =  [filtered_match for (unfiltered_match, filtered_match) in matches_list if condition(unfiltered_match)]
+    filtered_matches = (mapping_to_match(input_graph, pattern, mapping) for mapping in mappings
+                        if existential or condition(mapping_to_match(input_graph, pattern, mapping, filter=False)))
     # And finally, remove duplicates (might be created because we removed the anonymous nodes)
-    yield from _remove_duplicated_matches(filtered_matches)
+    matches = _remove_duplicated_matches(filtered_matches, stats)
+    yield from matches if limit is None else itertools.islice(matches, limit)
+
+# %% ../nbs/03_matcher.ipynb 53
+def _matches_with_nodes(input_graph: DiGraph, pattern: DiGraph, condition: FilterFunc = lambda match: True,
+                        fixed: dict[NodeName, NodeName] = None, predicates: Tuple[Callable, Callable] = None,
+                        workers: int = None, stats: RewriteStats = None, compact: bool = False,
+                        index: AttributeIndex = None, graph_stats: GraphStatistics = None, existential: bool = False
+                        ) -> Iterator[Tuple[Match, set[NodeName]]]:
+    """Like `find_matches`, but each match comes with the set of graph nodes it uses (including the anonymous ones),
+    and duplicated matches are not removed.
+
+    Args:
+        input_graph (DiGraph): A graph to find matches in
+        pattern (DiGraph): A pattern graph produced by the LHS Parser.
+        condition (FilterFunc, optional): A condition on the matches. Defaults to a condition function which always returns True.
+        fixed (dict[NodeName, NodeName], optional): Pattern nodes which may be mapped only to the given graph nodes. Defaults to None.
+        predicates (Tuple[Callable, Callable], optional): The node and edge predicates of the pattern, if they were already built.
+        workers (int, optional): If given (and no nodes are fixed), the search is split between this number of worker processes.
+        stats (RewriteStats, optional): If given, the search is timed and counted in it. Defaults to None.
+        compact (bool, optional): If True (and no nodes are fixed), the search runs over a compact snapshot of the input graph. Defaults to False.
+        index (AttributeIndex, optional): An attribute index of the input graph, which the search takes candidates from. Defaults to None.
+        graph_stats (GraphStatistics, optional): Statistics of the input graph, from which the order of the search is planned. Defaults to None.
+        existential (bool, optional): If True and there is no user condition, a single mapping of the anonymous nodes is searched for every
+            match (so the nodes of a match include only one choice of its anonymous nodes). Defaults to False.
+
+    Yields:
+        Iterator[Tuple[Match, set[NodeName]]]: The matches, and the graph nodes that each of them uses.
+    """
+    node_match, edge_match = predicates if predicates else _pattern_predicates(pattern)
+    twins = _twin_classes(pattern, condition)
+    constraints_only = _checks_constraints_only(pattern, condition)
+    existential = existential and constraints_only
+    node_match, edge_match, condition = _instrument_search(stats, node_match, edge_match, condition)
+    mappings = _search_mappings(input_graph, pattern, node_match, edge_match, fixed, workers, compact, index, graph_stats, twins,
+                                existential)
+    for mapping in _instrument_mappings(stats, mappings):
+        if constraints_only or condition(mapping_to_match(input_graph, pattern, mapping, filter=False)):
+            yield mapping_to_match(input_graph, pattern, mapping), set(mapping.values())
+
+# %% ../nbs/03_matcher.ipynb 54
+class _MatchPool:
+    """The matches of a pattern in a graph, which are kept up to date while the graph is changed."""
+    def __init__(self, input_graph: DiGraph, pattern: DiGraph, condition: FilterFunc = lambda match: True, workers: int = None,
+                 stats: RewriteStats = None, compact: bool = False, index: AttributeIndex = None, graph_stats: GraphStatistics = None):
+        self.graph, self.pattern, self.condition, self.stats, self.index = input_graph, pattern, condition, stats, index
+        self.graph_stats = graph_stats
+        self._predicates = _pattern_predicates(pattern)
+        # Match keys mapped to the match and the graph nodes it uses (including anonymous ones), in the order they were found
+        self._matches: dict[frozenset, Tuple[Match, set[NodeName]]] = {}
+        self._keys_by_node: dict[NodeName, set[frozenset]] = {}
+        # The initial search covers the whole graph, so it may be split between worker processes, or run over a compact snapshot
+        self._add_matches(_matches_with_nodes(input_graph, pattern, condition, predicates=self._predicates, workers=workers, stats=stats,
+                                              compact=compact, index=index, graph_stats=graph_stats, existential=True))
+
+    def _search(self, fixed: dict[NodeName, NodeName] = None) -> Iterator[Tuple[Match, set[NodeName]]]:
+        return _matches_with_nodes(self.graph, self.pattern, self.condition, fixed, self._predicates, stats=self.stats, index=self.index,
+                                   graph_stats=self.graph_stats, existential=True)
+
+    def _add_matches(self, matches: Iterable[Tuple[Match, set[NodeName]]]):
+        for match, match_nodes in matches:
+            match_key = match.key()
+            if match_key not in self._matches:
+                self._matches[match_key] = (match, match_nodes)
+                for node in match_nodes:
+                    self._keys_by_node.setdefault(node, set()).add(match_key)
+            elif self.stats is not None:
+                self.stats.count("duplicates")
+
+    def _remove_match(self, match_key: frozenset) -> Match:
+        match, match_nodes = self._matches.pop(match_key)
+        for node in match_nodes:
+            self._keys_by_node[node].discard(match_key)
+            if len(self._keys_by_node[node]) == 0:
+                del self._keys_by_node[node]
+        return match
+
+    def first(self) -> Optional[Match]:
+        """Returns the earliest found match in the pool, or None if there are no matches."""
+        return next(iter(self._matches.values()))[0] if self._matches else None
+
+    def __len__(self):
+        return len(self._matches)
+
+    def update(self, touched_nodes: Iterable[NodeName]):
+        """Update the pool after the graph was changed.
+
+        Args:
+            touched_nodes (Iterable[NodeName]): The graph nodes which were added, removed, or had their attributes or edges changed.
+                If the pool has an attribute index, it should be refreshed with these nodes before.
+        """
+        touched_nodes = set(touched_nodes)
+        # Check the matches which contain touched nodes again
+        affected_keys = set().union(*[self._keys_by_node.get(node, set()) for node in touched_nodes])
+        for match_key in affected_keys:
+            match = self._remove_match(match_key)
+            self._add_matches(itertools.islice(self._search(fixed=match.mapping), 1))
+        # Find the new matches, all of them contain a touched node
+        for node in touched_nodes:
+            if node in self.graph:
+                for pattern_node in self.pattern.nodes:
+                    self._add_matches(self._search(fixed={pattern_node: node}))
+
+# %% ../nbs/03_matcher.ipynb 56
+def _disjoint_matches(input_graph: DiGraph, pattern: DiGraph, condition: FilterFunc = lambda match: True, workers: int = None,
+                      stats: RewriteStats = None, compact: bool = False, index: AttributeIndex = None,
+                      graph_stats: GraphStatistics = None) -> list[Match]:
+    """Find a maximal set of matches of a pattern in a graph, such that no two matches share a graph node.
+
+    Args:
+        input_graph (DiGraph): A graph to find matches in
+        pattern (DiGraph): A pattern graph produced by the LHS Parser.
+        condition (FilterFunc, optional): A condition on the matches. Defaults to a condition function which always returns True.
+        workers (int, optional): If given, the search is split between this number of worker processes. Defaults to None.
+        stats (RewriteStats, optional): If given, the search is timed and counted in it. Defaults to None.
+        compact (bool, optional): If True, the search runs over a compact snapshot of the input graph. Defaults to False.
+        index (AttributeIndex, optional): An attribute index of the input graph, which the search takes candidates from. Defaults to None.
+        graph_stats (GraphStatistics, optional): Statistics of the input graph, from which the order of the search is planned. Defaults to None.
+
+    Returns:
+        list[Match]: Node-disjoint matches, in the order they were found.
+    """
+    matches, used = [], set()
+    for match, match_nodes in _matches_with_nodes(input_graph, pattern, condition, workers=workers, stats=stats, compact=compact,
+                                                   index=index, graph_stats=graph_stats):
+        if used.isdisjoint(match_nodes):
+            matches.append(match)
+            used.update(match_nodes)
+    return matches
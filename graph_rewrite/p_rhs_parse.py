@@ -1,19 +1,24 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/04_p_rhs_parsing.ipynb.
 
 # %% auto 0
-__all__ = ['p_parser', 'rhs_parser', 'rhs_to_graph', 'p_to_graph']
+__all__ = ['rhs_to_graph', 'p_to_graph', 'rhs_to_template', 'render_rhs_template', 'p_parser', 'rhs_parser']
 
 # %% ../nbs/04_p_rhs_parsing.ipynb 5
+from functools import cache
+from typing import *
 from lark import Lark
 from lark import UnexpectedCharacters, UnexpectedToken
 import networkx as nx
 from .match_class import Match,draw_match
-from .core import GraphRewriteException
+from .core import GraphRewriteException, NodeName, EdgeName, pattern_cache
 from .core import _create_graph, draw, _graphs_equal
 from .lhs import RenderFunc, graphRewriteTransformer
+from .fast_parse import _parse_simple
 
 # %% ../nbs/04_p_rhs_parsing.ipynb 7
-p_parser = Lark(r"""
+_all_ = ['p_parser', 'rhs_parser']
+
+_p_grammar = r"""
     %import common.WS -> WS
     %ignore WS
 
@@ -35,10 +40,16 @@ p_parser = Lark(r"""
     pattern: vertex (connection vertex)*
     patterns: pattern (";" pattern)* | empty
 
-    """, parser="lalr", start='patterns' , debug=True)
+    """
+
+@cache
+def _p_parser() -> Lark:
+    # Built on first use rather than on import. Lark keeps the LALR tables of the grammar in a cache file,
+    # so later processes load them instead of computing them again
+    return Lark(_p_grammar, parser="lalr", start='patterns', cache=True)
 
 # %% ../nbs/04_p_rhs_parsing.ipynb 9
-rhs_parser = Lark(r"""
+_rhs_grammar = r"""
     %import common.INT -> INT 
     %import common.FLOAT -> FLOAT
     %import common.ESCAPED_STRING -> STRING
@@ -69,7 +80,20 @@ rhs_parser = Lark(r"""
     pattern: vertex (connection vertex)*
     patterns: pattern (";" pattern)* | empty
 
-    """, parser="lalr", start='patterns' , debug=True)
+    """
+
+@cache
+def _rhs_parser() -> Lark:
+    # Built on first use, like the P parser
+    return Lark(_rhs_grammar, parser="lalr", start='patterns', cache=True)
+
+def __getattr__(name: str):
+    # The parsers are still available as `p_parser` and `rhs_parser`, and are built when they're first accessed
+    if name == 'p_parser':
+        return _p_parser()
+    if name == 'rhs_parser':
+        return _rhs_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # %% ../nbs/04_p_rhs_parsing.ipynb 11
 def rhs_to_graph(rhs: str, match: Match = None, render_funcs: dict[str, RenderFunc] = {}):
@@ -86,14 +110,17 @@ def rhs_to_graph(rhs: str, match: Match = None, render_funcs: dict[str, RenderFu
     Returns:
         DiGraph: a networkx graph that is the graph represented by the pattern, with rendered attribute values.
     """
-    try:
-        tree = rhs_parser.parse(rhs)
-        rhs_graph, _ = graphRewriteTransformer(component="RHS", match=match, render_funcs=render_funcs).transform(tree)                
-        return rhs_graph
-    except (BaseException, UnexpectedCharacters, UnexpectedToken) as e:
-        raise GraphRewriteException('Unable to convert RHS: {}'.format(e))
+    return render_rhs_template(_cached_rhs_template(rhs), match, render_funcs)
 
 # %% ../nbs/04_p_rhs_parsing.ipynb 12
+def _parse_p(p: str) -> nx.DiGraph:
+    # Simple patterns are parsed directly, and the rest by Lark (see `fast_parse`)
+    parsed = _parse_simple(p, "P")
+    if parsed is None:
+        parsed = graphRewriteTransformer(component="P").transform(_p_parser().parse(p))
+    p_graph, _ = parsed
+    return p_graph
+
 def p_to_graph(p: str):
     """Given an P pattern, return the directed graph represented by the pattern.
 
@@ -104,8 +131,73 @@ def p_to_graph(p: str):
         DiGraph: a networkx graph that is the graph represented by the pattern.
     """
     try:
-        tree = p_parser.parse(p)
-        p_graph, _ = graphRewriteTransformer(component="P").transform(tree)                
-        return p_graph
+        # the cached graph is shared, so every call gets its own copy
+        return pattern_cache.get(("P", p), lambda: _parse_p(p)).copy()
     except (BaseException, UnexpectedCharacters, UnexpectedToken) as e:
         raise GraphRewriteException('Unable to convert P: {}'.format(e))
+
+# %% ../nbs/04_p_rhs_parsing.ipynb 14
+class _Placeholder(NamedTuple):
+    """A slot in an RHS template, which is filled by the render function of the placeholder."""
+    name: str
+
+class _templateTransformer(graphRewriteTransformer):
+    def USER_VALUE(self, arg):
+        # keep a slot for the value, instead of rendering it
+        return _Placeholder(arg[2:-2])
+
+def _parse_rhs_template(rhs: str) -> nx.DiGraph:
+    parsed = _parse_simple(rhs, "RHS", placeholder=_Placeholder)
+    if parsed is None:
+        parsed = _templateTransformer(component="RHS").transform(_rhs_parser().parse(rhs))
+    template, _ = parsed
+    # list the slots in advance, so rendering doesn't go over all the attributes (as tuples, which copies of the template can share)
+    template.graph['node_placeholders'] = tuple((node, attr, value.name) for node, attrs in template.nodes(data=True)
+                                                for attr, value in attrs.items() if isinstance(value, _Placeholder))
+    template.graph['edge_placeholders'] = tuple(((s, t), attr, value.name) for s, t, attrs in template.edges(data=True)
+                                                for attr, value in attrs.items() if isinstance(value, _Placeholder))
+    return template
+
+def _cached_rhs_template(rhs: str) -> nx.DiGraph:
+    try:
+        return pattern_cache.get(("RHS", rhs), lambda: _parse_rhs_template(rhs))
+    except (BaseException, UnexpectedCharacters, UnexpectedToken) as e:
+        raise GraphRewriteException('Unable to convert RHS: {}'.format(e))
+
+def rhs_to_template(rhs: str) -> nx.DiGraph:
+    """Given an RHS pattern, return the directed graph represented by the pattern, in which the values of
+    placeholders are not rendered yet. Such a template is parsed once, and can be rendered for many matches
+    by `render_rhs_template`.
+
+    Args:
+        rhs (string): A string in lhs format
+
+    Returns:
+        DiGraph: a networkx graph that is the graph represented by the pattern. The placeholder attributes of its
+                 nodes and edges are listed in its `node_placeholders` and `edge_placeholders` graph attributes.
+    """
+    # the cached template is shared, so every call gets its own copy
+    return _cached_rhs_template(rhs).copy()
+
+def render_rhs_template(template: nx.DiGraph, match: Match = None, render_funcs: dict[str, RenderFunc] = {}) -> nx.DiGraph:
+    """Given an RHS template (see `rhs_to_template`), a match caught by the LHS, and functions that represent the values of the
+    placeholders in the pattern, return the RHS graph with rendered attribute values according to the functions and the match.
+
+    Args:
+        template (DiGraph): An RHS template
+        match (Match): a match object caught by the matcher module
+        render_funcs (dict[str, RenderFunc]): A dictionary supplied by the user
+                                              indicating which value every placeholder should be rendered with.
+
+    Returns:
+        DiGraph: a networkx graph that is the graph represented by the pattern, with rendered attribute values.
+    """
+    rhs_graph = template.copy()
+    try:
+        for node, attr, name in template.graph['node_placeholders']:
+            rhs_graph.nodes[node][attr] = render_funcs[name](match)
+        for edge, attr, name in template.graph['edge_placeholders']:
+            rhs_graph.edges[edge][attr] = render_funcs[name](match)
+    except BaseException as e:
+        raise GraphRewriteException('Unable to convert RHS: {}'.format(e))
+    return rhs_graph
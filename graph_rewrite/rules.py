@@ -5,6 +5,8 @@ __all__ = ['MergePolicy', 'Rule']
 
 # %% ../nbs/05_rules.ipynb 5
 from typing import *
+from copy import copy
+from functools import wraps
 from networkx import DiGraph
 
 from .core import GraphRewriteException, NodeName, EdgeName, _create_graph, draw
@@ -84,6 +86,24 @@ _exception_msgs = {
 }
 
 # %% ../nbs/05_rules.ipynb 10
+def _cached_operation(operation: Callable) -> Callable:
+    """Decorate a method of the Rule class which derives operations from the rule graphs,
+    such that the operations are derived only on the first call, and are reused afterwards.
+
+    Args:
+        operation (Callable): A method of the Rule class, which gets no arguments other than the rule
+
+    Returns:
+        Callable: The cached method
+    """
+    @wraps(operation)
+    def cached_operation(rule):
+        if operation.__name__ not in rule._operations:
+            rule._operations[operation.__name__] = operation(rule)
+        return rule._operations[operation.__name__]
+    return cached_operation
+
+# %% ../nbs/05_rules.ipynb 11
 class Rule:
     global _exception_msgs
     """A transformation rule, defined by 1-3 graphs:
@@ -96,6 +116,7 @@ class Rule:
         self.p = p if p else self.lhs.copy()
         self.rhs = rhs if rhs else self.p.copy()
         self.merge_policy = merge_policy
+        self._operations = {} # cached operations, by the name of the method that derives them
 
         self._p_to_lhs, self._p_to_rhs = {}, {}
         self._merge_sym, self._clone_sym = '&', '*'
@@ -319,7 +340,25 @@ class Rule:
                     merge_rhs_attrs = self.merge_policy(merge_rhs_attrs, new_rhs_attrs)
         return merge_rhs_attrs
 
+    def _with_rhs(self, rhs: DiGraph) -> 'Rule':
+        """Create a copy of the rule with another rendering of its RHS. That is, an RHS with the same nodes, edges
+        and attribute names, but possibly with different attribute values (e.g., a templated RHS rendered for another match).
+        The structure of the rule is not derived (nor validated) again - only the attributes to add are.
+
+        Args:
+            rhs (DiGraph): The RHS graph, rendered differently
+
+        Returns:
+            Rule: A rule with the new RHS
+        """
+        rule = copy(self)
+        rule.rhs = rhs
+        rule._operations = {name: operations for name, operations in self._operations.items() \
+                            if name not in ('node_attrs_to_add', 'edge_attrs_to_add')}
+        return rule
+
     # The following functions are presented in the order of transformation.
+    @_cached_operation
     def nodes_to_clone(self) -> dict[NodeName, set[NodeName]]:
         """Find all LHS nodes that should be cloned in P, and for each node, find all its P clones.
 
@@ -333,6 +372,7 @@ class Rule:
         return {lhs_node: self._rev_p_lhs[lhs_node] for lhs_node in self.lhs.nodes() \
                             if len(self._rev_p_lhs.get(lhs_node, set())) > 1}
 
+    @_cached_operation
     def nodes_to_remove(self) -> set[NodeName]:
         """Find all LHS nodes that should be removed.
 
@@ -343,6 +383,7 @@ class Rule:
         # Find all LHS nodes which are not mapped by any node in P (in the P->LHS Hom.)
         return {lhs_node for lhs_node in self.lhs.nodes() if len(self._rev_p_lhs.get(lhs_node, set())) == 0}
 
+    @_cached_operation
     def edges_to_remove(self) -> set[EdgeName]:
         """Find all P edges that should be removed.
 
@@ -353,9 +394,10 @@ class Rule:
             set[EdgeName]: Edges in P which should be removed.
         """
         edges_to_remove = set()
+        nodes_to_remove = self.nodes_to_remove()
         for s, t in self.lhs.edges():
             # If one of the edge endpoints was removed, the edge was removed automatically so we skip it here
-            if s not in self.nodes_to_remove() and t not in self.nodes_to_remove():
+            if s not in nodes_to_remove and t not in nodes_to_remove:
                 s_copies, t_copies = self._rev_p_lhs.get(s, set()), self._rev_p_lhs.get(t, set())
                 for s_copy in s_copies:
                     for t_copy in t_copies:
@@ -364,6 +406,7 @@ class Rule:
                             edges_to_remove.add((s_copy, t_copy))
         return edges_to_remove
 
+    @_cached_operation
     def node_attrs_to_remove(self) -> dict[NodeName, set]:
         """For each P node, find all attributes of its corresponding LHS node
         which should be removed from it in P.
@@ -387,6 +430,7 @@ class Rule:
                         attrs_to_remove[node_p] = diff_attrs
         return attrs_to_remove
 
+    @_cached_operation
     def edge_attrs_to_remove(self) -> dict[EdgeName, set]:
         """For each P edge, find all attributes of its corresponding LHS edge
         which should be removed from it in P.
@@ -411,6 +455,7 @@ class Rule:
                             attrs_to_remove[(s_copy, t_copy)] = diff_attrs
         return attrs_to_remove
 
+    @_cached_operation
     def nodes_to_merge(self) -> dict[NodeName, set[NodeName]]:
         """Find all RHS nodes which are a merge of nodes in P, and for each node, find all P nodes that merge into it.
 
@@ -424,6 +469,7 @@ class Rule:
         return {rhs_node: self._rev_p_rhs[rhs_node] for rhs_node in self.rhs.nodes() \
                             if len(self._rev_p_rhs.get(rhs_node, set())) > 1}
 
+    @_cached_operation
     def nodes_to_add(self) -> set[NodeName]:
         """Find all RHS nodes which should be added.
 
@@ -436,6 +482,7 @@ class Rule:
         # Find all RHS nodes which are not mapped by any node in P (in the P->RHS Hom.)
         return {rhs_node for rhs_node in self.rhs.nodes() if len(self._rev_p_rhs.get(rhs_node, set())) == 0}
 
+    @_cached_operation
     def edges_to_add(self) -> set[EdgeName]:
         """Find all RHS edges that should be added. 
 
@@ -456,6 +503,7 @@ class Rule:
                     edges_to_add.add((s,t))
         return edges_to_add
 
+    @_cached_operation
     def node_attrs_to_add(self) -> dict[NodeName, dict]:
         """For each RHS node, find all attributes (and values) of its corresponding P node(s)
         which should be added to the RHS node.
@@ -476,6 +524,7 @@ class Rule:
                     attrs_to_add[node_rhs] = merged_p_attrs
         return attrs_to_add
 
+    @_cached_operation
     def edge_attrs_to_add(self) -> dict[EdgeName, dict]:
         """For each RHS edge, find all attributes (and values) of its corresponding P edge(s)
         which should be added to the RHS edge.
@@ -495,4 +544,3 @@ class Rule:
                 if len(merged_p_attrs) != 0:
                     attrs_to_add[(s, t)] = merged_p_attrs
         return attrs_to_add
-
@@ -1,19 +1,27 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/06_transform.ipynb.
 
 # %% auto 0
-__all__ = ['rewrite_iter', 'rewrite']
+__all__ = ['rewrite_iter', 'rewrite', 'rewrite_many']
 
 # %% ../nbs/06_transform.ipynb 5
+import logging
 from typing import *
+import os
+import math
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import networkx as nx
 from networkx import DiGraph
+from networkx.classes.reportviews import NodeView, OutEdgeView
 from copy import deepcopy
 from fastcore.meta import delegates
 
-from .core import NodeName, EdgeName, _create_graph, draw, _graphs_equal, GraphRewriteException
+from .core import NodeName, EdgeName, _create_graph, draw, _graphs_equal, GraphRewriteException, RewriteStats, _phase
 from .lhs import lhs_to_graph
 from .match_class import Match, mapping_to_match,draw_match
-from .matcher import find_matches, FilterFunc
-from .p_rhs_parse import RenderFunc, p_to_graph, rhs_to_graph
+from .matcher import find_matches, FilterFunc, AttributeIndex, GraphStatistics, _MatchPool, _disjoint_matches, _checks_constraints_only
+from .p_rhs_parse import RenderFunc, p_to_graph, rhs_to_graph, rhs_to_template, render_rhs_template
 from .rules import Rule, MergePolicy
 
 # %% ../nbs/06_transform.ipynb 7
@@ -26,7 +34,41 @@ _exception_msgs = {
     "not_enough_to_merge": lambda: f"Tried to merge less than one nodes."
 }
 
-# %% ../nbs/06_transform.ipynb 8
+# %% ../nbs/06_transform.ipynb 9
+class _UndoLog:
+    """Records the inverse of every change that the transformation primitives make to a graph,
+    so that a partially applied transformation can be rolled back. It also records the nodes which were touched by the changes
+    (added, removed, or had their attributes or edges changed).
+    """
+    def __init__(self):
+        self._inverse_ops: list[Tuple[Callable, tuple]] = []
+        self.touched_nodes: set[NodeName] = set()
+
+    def record(self, inverse_op: Callable, *args):
+        """Record the inverse of a change that was just made.
+
+        Args:
+            inverse_op (Callable): A function that reverts the change
+            args: The arguments to call inverse_op with
+        """
+        self._inverse_ops.append((inverse_op, args))
+
+    def touch(self, *nodes: NodeName):
+        """Record nodes which were touched by a change.
+        """
+        self.touched_nodes.update(nodes)
+
+    def rollback(self):
+        """Revert all the recorded changes, from the last to the first, and clear the log.
+        """
+        while len(self._inverse_ops) > 0:
+            inverse_op, args = self._inverse_ops.pop()
+            inverse_op(*args)
+
+    def __len__(self):
+        return len(self._inverse_ops)
+
+# %% ../nbs/06_transform.ipynb 10
 def _generate_new_node_name(graph: DiGraph, base_name: NodeName) -> NodeName:
     """Generate a name for a new node, which is unique in the graph to which the node is added,
     based on an initial name suggestion.
@@ -48,8 +90,39 @@ def _generate_new_node_name(graph: DiGraph, base_name: NodeName) -> NodeName:
         new_name = f"{base_name}_{i}"
     return new_name
 
-# %% ../nbs/06_transform.ipynb 9
-def _clone_node(graph: DiGraph, node_to_clone: NodeName) -> NodeName:
+# %% ../nbs/06_transform.ipynb 11
+def _restore_node(graph: DiGraph, node: NodeName, attrs: dict, in_edges: list, out_edges: list):
+    """Re-add a node that was removed from the graph, along with its attributes and connected edges
+    (used for rolling back a node removal).
+
+    Args:
+        graph (DiGraph): A graph
+        node (NodeName): The removed node
+        attrs (dict): The attributes of the removed node
+        in_edges (list): The (src, node, attrs) triplets of the edges entering the node
+        out_edges (list): The (node, target, attrs) triplets of the edges leaving the node
+    """
+    graph.add_node(node, **attrs)
+    graph.add_edges_from(in_edges)
+    graph.add_edges_from(out_edges)
+
+def _restore_attrs(elements: Union[NodeView, OutEdgeView], element: Union[NodeName, EdgeName], old_attrs: dict, added_attrs: set):
+    """Restore the attributes of a node or an edge (used for rolling back attribute changes).
+
+    Args:
+        elements (Union[NodeView, OutEdgeView]): The nodes or the edges of a graph
+        element (Union[NodeName, EdgeName]): A node or an edge in the graph
+        old_attrs (dict): Attributes which were removed or overridden, mapped to their previous values
+        added_attrs (set): Attributes which did not exist before the change
+    """
+    # The element is looked up again, since it might have been removed and restored since the change
+    attrs = elements[element]
+    for attr in added_attrs:
+        attrs.pop(attr, None)
+    attrs.update(old_attrs)
+
+# %% ../nbs/06_transform.ipynb 12
+def _clone_node(graph: DiGraph, node_to_clone: NodeName, undo_log: _UndoLog = None) -> NodeName:
     """Clones a node in the graph. That is, create a new node, whose name denotes its connection to the original node,
     whose edges are copies of the edges connected to the original node, and whose attributes are duplicated
     from the original node.
@@ -57,6 +130,7 @@ def _clone_node(graph: DiGraph, node_to_clone: NodeName) -> NodeName:
     Args:
         graph (DiGraph): A graph
         node_to_clone (NodeName): A node in the graph to be cloned
+        undo_log (_UndoLog, optional): If given, the inverse of every change is recorded in it. Defaults to None.
 
     Raises:
         GraphRewriteException: If the node which should be cloned does not exist in the graph
@@ -73,6 +147,11 @@ def _clone_node(graph: DiGraph, node_to_clone: NodeName) -> NodeName:
     # Add this new node to graph
     cloned_node_attrs = graph.nodes(data=True)[node_to_clone]
     graph.add_node(clone_name, **cloned_node_attrs)
+    if undo_log is not None:
+        # Removing the clone also removes its cloned edges
+        undo_log.record(graph.remove_node, clone_name)
+        # The neighbors of the original node gain an edge to the clone
+        undo_log.touch(clone_name, *graph.predecessors(node_to_clone), *graph.successors(node_to_clone))
 
     # Clone edges (connect the clone to all original edge endpoints + copy attrs)
     for n, _ in graph.in_edges(node_to_clone):
@@ -87,44 +166,57 @@ def _clone_node(graph: DiGraph, node_to_clone: NodeName) -> NodeName:
  
     return clone_name
 
-# %% ../nbs/06_transform.ipynb 10
-def _remove_node(graph: DiGraph, node_to_remove: NodeName):
+# %% ../nbs/06_transform.ipynb 13
+def _remove_node(graph: DiGraph, node_to_remove: NodeName, undo_log: _UndoLog = None):
     """Remove a node from the graph.
 
     Args:
         graph (DiGraph): A graph
         node_to_remove (NodeName): A node to remove from the graph
+        undo_log (_UndoLog, optional): If given, the inverse of every change is recorded in it. Defaults to None.
 
     Raises:
         GraphRewriteException: If the removed node doesn't exist in the graph
     """
     if node_to_remove not in graph.nodes():
         raise GraphRewriteException(_exception_msgs["no_such_node"](node_to_remove))
+    if undo_log is not None:
+        # A self loop is both an in-edge and an out-edge, so it is saved once
+        undo_log.record(_restore_node, graph, node_to_remove, graph.nodes[node_to_remove],
+                        list(graph.in_edges(node_to_remove, data=True)),
+                        [(s, t, attrs) for s, t, attrs in graph.out_edges(node_to_remove, data=True) if t != node_to_remove])
+        # The neighbors lose an edge, which might change the matches around them
+        undo_log.touch(node_to_remove, *graph.predecessors(node_to_remove), *graph.successors(node_to_remove))
     graph.remove_node(node_to_remove)
 
-# %% ../nbs/06_transform.ipynb 11
-def _remove_edge(graph: DiGraph, edge_to_remove: EdgeName):
+# %% ../nbs/06_transform.ipynb 14
+def _remove_edge(graph: DiGraph, edge_to_remove: EdgeName, undo_log: _UndoLog = None):
     """Remove an edge from the graph.
 
     Args:
         graph (DiGraph): A graph
         edge_to_remove (EdgeName): An edge to remove from the graph
+        undo_log (_UndoLog, optional): If given, the inverse of every change is recorded in it. Defaults to None.
 
     Raises:
         GraphRewriteException: If the removed edge doesn't exist in the graph
     """
     if edge_to_remove not in graph.edges():
         raise GraphRewriteException(_exception_msgs["no_such_edge"](edge_to_remove))
+    if undo_log is not None:
+        undo_log.record(graph.add_edges_from, [(*edge_to_remove, graph.edges[edge_to_remove])])
+        undo_log.touch(*edge_to_remove)
     graph.remove_edge(*edge_to_remove)
 
-# %% ../nbs/06_transform.ipynb 12
-def _remove_node_attrs(graph: DiGraph, node: NodeName, attrs_to_remove: set):
+# %% ../nbs/06_transform.ipynb 15
+def _remove_node_attrs(graph: DiGraph, node: NodeName, attrs_to_remove: set, undo_log: _UndoLog = None):
     """Remove a subset of some node's attributes from the node.
 
     Args:
         graph (DiGraph): A graph
         node (NodeName): A node in the graph
         attrs_to_remove (set): Attributes of that node to remove
+        undo_log (_UndoLog, optional): If given, the inverse of every change is recorded in it. Defaults to None.
 
     Raises:
         GraphRewriteException: If the node doesn't exist in the graph, or some of the removed attrs don't exist in the node
@@ -134,16 +226,20 @@ def _remove_node_attrs(graph: DiGraph, node: NodeName, attrs_to_remove: set):
     for attr in attrs_to_remove:
         if attr not in graph.nodes[node]:
             raise GraphRewriteException(_exception_msgs["no_such_attr_in_node"](attr, node))
+        if undo_log is not None:
+            undo_log.record(_restore_attrs, graph.nodes, node, {attr: graph.nodes[node][attr]}, set())
+            undo_log.touch(node)
         del graph.nodes[node][attr]
 
-# %% ../nbs/06_transform.ipynb 13
-def _remove_edge_attrs(graph: DiGraph, edge: EdgeName, attrs_to_remove: set):
+# %% ../nbs/06_transform.ipynb 16
+def _remove_edge_attrs(graph: DiGraph, edge: EdgeName, attrs_to_remove: set, undo_log: _UndoLog = None):
     """Remove a subset of some edge's attributes from the node.
 
     Args:
         graph (DiGraph): A graph
         edge (EdgeName): An edge in the graph
         attrs_to_remove (set): Attributes of that edge to remove
+        undo_log (_UndoLog, optional): If given, the inverse of every change is recorded in it. Defaults to None.
 
     Raises:
         GraphRewriteException: If the edge doesn't exist in the graph, or some of the removed attrs don't exist in the edge
@@ -154,10 +250,13 @@ def _remove_edge_attrs(graph: DiGraph, edge: EdgeName, attrs_to_remove: set):
     for attr in attrs_to_remove:
         if attr not in graph.edges[edge]:
             raise GraphRewriteException(_exception_msgs["no_such_attr_in_edge"](attr, edge))
+        if undo_log is not None:
+            undo_log.record(_restore_attrs, graph.edges, edge, {attr: graph.edges[edge][attr]}, set())
+            undo_log.touch(*edge)
         del graph.edges[edge][attr]
 
-# %% ../nbs/06_transform.ipynb 14
-def _setup_merged_node(graph: DiGraph, nodes_to_merge: set[NodeName], merge_policy: MergePolicy):
+# %% ../nbs/06_transform.ipynb 17
+def _setup_merged_node(graph: DiGraph, nodes_to_merge: set[NodeName], merge_policy: MergePolicy, undo_log: _UndoLog = None):
     """A helper function for node merging. It calculates all the parameters needed for creating the merged node,
     such as its name, its attributes, the connected edges and their attributes, etc., and returns them all.
     In addition, it removes the original nodes (which are about to be merged) from the graph.
@@ -166,6 +265,7 @@ def _setup_merged_node(graph: DiGraph, nodes_to_merge: set[NodeName], merge_poli
         graph (DiGraph): A graph
         nodes_to_merge (set[NodeName]): A set of nodes in the graph to merge
         merge_policy (MergePolicy): A policy that dictates how to merge conflicting attributes
+        undo_log (_UndoLog, optional): If given, the inverse of every change is recorded in it. Defaults to None.
 
     Returns:
         All the parameters needed for creating the merged node, in this order:
@@ -218,13 +318,13 @@ def _setup_merged_node(graph: DiGraph, nodes_to_merge: set[NodeName], merge_poli
                 self_loop = True
                 self_loop_attrs = merge_policy(self_loop_attrs, edge_attrs)
 
-        graph.remove_node(node_to_merge)
+        _remove_node(graph, node_to_merge, undo_log)
 
     return merged_node_name, merged_node_attrs, merged_src_nodes, merged_target_nodes,\
             merged_src_attrs, merged_target_attrs, self_loop, self_loop_attrs
 
-# %% ../nbs/06_transform.ipynb 15
-def _merge_nodes(graph: DiGraph, nodes_to_merge: set[NodeName], merge_policy: MergePolicy) -> NodeName:
+# %% ../nbs/06_transform.ipynb 18
+def _merge_nodes(graph: DiGraph, nodes_to_merge: set[NodeName], merge_policy: MergePolicy, undo_log: _UndoLog = None) -> NodeName:
     """Merge a set of nodes in the graph. That is, remove all these nodes and replace them with a new node,
     whose attributes merge the attributes of the original nodes, whose connected edges merge the edges connected to
     the original node, and whose name denotes the nodes which it merges.
@@ -233,6 +333,7 @@ def _merge_nodes(graph: DiGraph, nodes_to_merge: set[NodeName], merge_policy: Me
         graph (DiGraph): A graph
         nodes_to_merge (set[NodeName]): A set of nodes to merge
         merge_policy (MergePolicy): A policy that dictates how to merge conflicting attributes
+        undo_log (_UndoLog, optional): If given, the inverse of every change is recorded in it. Defaults to None.
 
     Raises:
         GraphRewriteException: If the set of nodes to merge is too small (less than two nodes), or if one of them doesn't
@@ -250,10 +351,14 @@ def _merge_nodes(graph: DiGraph, nodes_to_merge: set[NodeName], merge_policy: Me
             raise GraphRewriteException(_exception_msgs["no_such_node"](node_to_merge))
 
     merged_node_name, merged_node_attrs, merged_src_nodes, merged_target_nodes, \
-        merged_src_attrs, merged_target_attrs, self_loop, self_loop_attrs = _setup_merged_node(graph, node_to_merge, merge_policy)
+        merged_src_attrs, merged_target_attrs, self_loop, self_loop_attrs = _setup_merged_node(graph, nodes_to_merge, merge_policy, undo_log)
 
     # Add merged node to graph
     graph.add_node(merged_node_name, **merged_node_attrs)
+    if undo_log is not None:
+        # Removing the merged node also removes all the edges added below
+        undo_log.record(graph.remove_node, merged_node_name)
+        undo_log.touch(merged_node_name)
 
     # Add merged source and target edges (including a new self loop)
     if self_loop:
@@ -275,13 +380,14 @@ def _merge_nodes(graph: DiGraph, nodes_to_merge: set[NodeName], merge_policy: Me
 
     return merged_node_name
 
-# %% ../nbs/06_transform.ipynb 16
-def _add_node(graph: DiGraph, node_to_add: NodeName) -> NodeName:
+# %% ../nbs/06_transform.ipynb 19
+def _add_node(graph: DiGraph, node_to_add: NodeName, undo_log: _UndoLog = None) -> NodeName:
     """Add a new node to the graph.
 
     Args:
         graph (DiGraph): A graph
         node_to_add (NodeName): The desired name of the new node
+        undo_log (_UndoLog, optional): If given, the inverse of every change is recorded in it. Defaults to None.
 
     Returns:
         NodeName: The name of the new added node (based on the name suggested)
@@ -289,15 +395,19 @@ def _add_node(graph: DiGraph, node_to_add: NodeName) -> NodeName:
     # Create a new node name
     new_name = _generate_new_node_name(graph, node_to_add)
     graph.add_node(new_name)
+    if undo_log is not None:
+        undo_log.record(graph.remove_node, new_name)
+        undo_log.touch(new_name)
     return new_name
 
-# %% ../nbs/06_transform.ipynb 17
-def _add_edge(graph: DiGraph, edge_to_add: EdgeName):
+# %% ../nbs/06_transform.ipynb 20
+def _add_edge(graph: DiGraph, edge_to_add: EdgeName, undo_log: _UndoLog = None):
     """Add an edge to the graph.
 
     Args:
         graph (DiGraph): A graph
         edge_to_add (EdgeName): The edge to add.
+        undo_log (_UndoLog, optional): If given, the inverse of every change is recorded in it. Defaults to None.
 
     Raises:
         GraphRewriteException: If one of the edge's endpoints doesn't exist in the graph, or the edge itself already exists.
@@ -311,59 +421,82 @@ def _add_edge(graph: DiGraph, edge_to_add: EdgeName):
         raise GraphRewriteException(_exception_msgs["edge_exists"](edge_to_add))
     else:
         graph.add_edge(src, target)
+        if undo_log is not None:
+            undo_log.record(graph.remove_edge, src, target)
+            undo_log.touch(src, target)
 
-# %% ../nbs/06_transform.ipynb 18
-def _add_node_attrs(graph: DiGraph, node: NodeName, attrs_to_add: dict):
+# %% ../nbs/06_transform.ipynb 21
+def _add_node_attrs(graph: DiGraph, node: NodeName, attrs_to_add: dict, undo_log: _UndoLog = None):
     """Add attributes to a node in the graph.
 
     Args:
         graph (DiGraph): A graph
         node (NodeName): A node in the graph
         attrs_to_add (dict): Attributes to add to the node
+        undo_log (_UndoLog, optional): If given, the inverse of every change is recorded in it. Defaults to None.
 
     Raises:
         GraphRewriteException: If the node doesn't exist in the graph
     """
     if node not in graph.nodes():
         raise GraphRewriteException(_exception_msgs["no_such_node"](node))
+    if undo_log is not None:
+        attrs = graph.nodes[node]
+        undo_log.record(_restore_attrs, graph.nodes, node, {attr: attrs[attr] for attr in attrs_to_add if attr in attrs},
+                        {attr for attr in attrs_to_add if attr not in attrs})
+        undo_log.touch(node)
     for attr, val in attrs_to_add.items():
         graph.nodes[node][attr] = val
 
-# %% ../nbs/06_transform.ipynb 19
-def _add_edge_attrs(graph: DiGraph, edge: EdgeName, attrs_to_add: dict):
+# %% ../nbs/06_transform.ipynb 22
+def _add_edge_attrs(graph: DiGraph, edge: EdgeName, attrs_to_add: dict, undo_log: _UndoLog = None):
     """Add attributes to an edge in the graph.
 
     Args:
         graph (DiGraph): A graph
         edge (EdgeName): An edge in the graph
         attrs_to_add (dict): Attributes to add to the edge
+        undo_log (_UndoLog, optional): If given, the inverse of every change is recorded in it. Defaults to None.
 
     Raises:
         GraphRewriteException: If the edge doesn't exist in the graph
     """
     if edge not in graph.edges():
         raise GraphRewriteException(_exception_msgs["no_such_edge"](edge))
+    if undo_log is not None:
+        attrs = graph.edges[edge]
+        undo_log.record(_restore_attrs, graph.edges, edge, {attr: attrs[attr] for attr in attrs_to_add if attr in attrs},
+                        {attr for attr in attrs_to_add if attr not in attrs})
+        undo_log.touch(*edge)
     for attr, val in attrs_to_add.items():
         graph.edges[edge][attr] = val
 
-# %% ../nbs/06_transform.ipynb 21
+# %% ../nbs/06_transform.ipynb 25
 _GREEN = '\033[92m'
 _RED = '\033[91m'
 _BLACK = '\033[0m'
 
-def _log(msg: str, is_log: bool, color: str = _BLACK):
-    """Logging some message to the console.
+_logger = logging.getLogger("graph_rewrite.transform")
+
+def _log(is_log: bool, event: str, msg: str, *args, color: str = _BLACK):
+    """Log a rewriting event, to the console and/or to the `graph_rewrite.transform` logger.
+    The message is formatted only if it's actually printed or logged.
 
     Args:
-        msg (str): A message to log
-        is_log (bool): If True, the log is printed (otherwise, it isn't).
+        is_log (bool): If True, the log is printed to the console (regardless of the logger).
+        event (str): The kind of the event (e.g. "remove_node"), which is attached to the log record as `record.rewrite_event`.
+        msg (str): A %-style format of the message to log
+        args: The arguments of the message (these are also available as `record.args`)
         color (str, optional): A color for the printed message. Defaults to _BLACK.
     """
     if is_log:
-        print(f"{color}{msg}{_BLACK}")
+        print(f"{color}{msg % args}{_BLACK}")
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug(msg, *args, extra={"rewrite_event": event})
 
-# %% ../nbs/06_transform.ipynb 22
-def _rewrite_match_restrictive(input_graph: DiGraph, rule: Rule, lhs_input_map: dict[NodeName, NodeName], is_log: bool) -> dict[NodeName, NodeName]:
+# %% ../nbs/06_transform.ipynb 26
+def _rewrite_match_restrictive(input_graph: DiGraph, rule: Rule, lhs_input_map: dict[NodeName, NodeName], is_log: bool,
+                               undo_log: _UndoLog = None) -> dict[NodeName, NodeName]:
     """Performs the restrictive phase of the rewriting process on some match: Clone nodes, Remove nodes and edges (and/or their attributes).
 
     Args:
@@ -371,6 +504,7 @@ def _rewrite_match_restrictive(input_graph: DiGraph, rule: Rule, lhs_input_map:
         rule (Rule): A rule that dictates what transformations should the graph go through
         lhs_input_map (dict[NodeName, NodeName]): Maps names of LHS nodes to names of input graph nodes, based on the match which we rewrite
         is_log (bool): If True, logs are printed throughout the process.
+        undo_log (_UndoLog, optional): If given, the inverse of every change is recorded in it. Defaults to None.
 
     Returns:
         dict[NodeName, NodeName]: maps names of P nodes to names of input graph nodes
@@ -391,13 +525,13 @@ def _rewrite_match_restrictive(input_graph: DiGraph, rule: Rule, lhs_input_map:
         for p_clone in p_clones:
             # Original cloned node is reused in P, preserve it
             if p_clone == cloned_lhs_node:
-                _log(f"Clone {lhs_input_map[cloned_lhs_node]}", is_log)
+                _log(is_log, "clone", "Clone %s", lhs_input_map[cloned_lhs_node])
                 cloned_to_flags_map[cloned_lhs_node] = True
                 p_input_map[p_clone] = lhs_input_map[cloned_lhs_node]
             # All other clones require actual cloning (mapped to the new cloned node in input graph)
             else:
-                new_clone_id = _clone_node(input_graph, lhs_input_map[cloned_lhs_node])
-                _log(f"Clone {lhs_input_map[cloned_lhs_node]} as {new_clone_id}", is_log)
+                new_clone_id = _clone_node(input_graph, lhs_input_map[cloned_lhs_node], undo_log)
+                _log(is_log, "clone", "Clone %s as %s", lhs_input_map[cloned_lhs_node], new_clone_id)
                 p_input_map[p_clone] = new_clone_id
 
     """Remove nodes, complete p->input mapping with preserved nodes which are not clones:
@@ -408,8 +542,8 @@ def _rewrite_match_restrictive(input_graph: DiGraph, rule: Rule, lhs_input_map:
     for lhs_node in rule.lhs.nodes():
         # Cloned lhs nodes which weren't reused and so, should be deleted
         if lhs_node in rule.nodes_to_remove() or (lhs_node in cloned_to_flags_map.keys() and cloned_to_flags_map[lhs_node] == False):
-            _log(f"Remove node {lhs_input_map[lhs_node]}", is_log)
-            _remove_node(input_graph, lhs_input_map[lhs_node])        
+            _log(is_log, "remove_node", "Remove node %s", lhs_input_map[lhs_node])
+            _remove_node(input_graph, lhs_input_map[lhs_node], undo_log)        
         # Else, either a saved cloned node (already preserved) or a regular one (should preserve them)
         elif lhs_node not in cloned_to_flags_map.keys():
             p_node = list(rule._rev_p_lhs[lhs_node])[0]
@@ -417,23 +551,24 @@ def _rewrite_match_restrictive(input_graph: DiGraph, rule: Rule, lhs_input_map:
 
     # Remove edges.
     for lhs_src, lhs_target in rule.edges_to_remove():
-        _log(f"Remove edge ({p_input_map[lhs_src]}, {p_input_map[lhs_target]})", is_log)
-        _remove_edge(input_graph, (p_input_map[lhs_src], p_input_map[lhs_target]))
+        _log(is_log, "remove_edge", "Remove edge (%s, %s)", p_input_map[lhs_src], p_input_map[lhs_target])
+        _remove_edge(input_graph, (p_input_map[lhs_src], p_input_map[lhs_target]), undo_log)
 
     # Remove node attrs.
     for p_node, attrs_to_remove in rule.node_attrs_to_remove().items():
-        _log(f"Remove attrs {attrs_to_remove} from node {p_input_map[p_node]}", is_log)
-        _remove_node_attrs(input_graph, p_input_map[p_node], attrs_to_remove)
+        _log(is_log, "remove_node_attrs", "Remove attrs %s from node %s", attrs_to_remove, p_input_map[p_node])
+        _remove_node_attrs(input_graph, p_input_map[p_node], attrs_to_remove, undo_log)
 
     # Remove edge attrs.
     for (p_src, p_target), attrs_to_remove in rule.edge_attrs_to_remove().items():
-        _log(f"Remove attrs {attrs_to_remove} from edge {(p_input_map[p_src], p_input_map[p_target])}", is_log)
-        _remove_edge_attrs(input_graph, (p_input_map[p_src], p_input_map[p_target]), attrs_to_remove)
+        _log(is_log, "remove_edge_attrs", "Remove attrs %s from edge %s", attrs_to_remove, (p_input_map[p_src], p_input_map[p_target]))
+        _remove_edge_attrs(input_graph, (p_input_map[p_src], p_input_map[p_target]), attrs_to_remove, undo_log)
 
     return p_input_map
 
-# %% ../nbs/06_transform.ipynb 23
-def _rewrite_match_expansive(input_graph: DiGraph, rule: Rule, p_input_map: dict[NodeName, NodeName], is_log: bool):
+# %% ../nbs/06_transform.ipynb 27
+def _rewrite_match_expansive(input_graph: DiGraph, rule: Rule, p_input_map: dict[NodeName, NodeName], is_log: bool,
+                             undo_log: _UndoLog = None):
     """Performs the expansive phase of the rewriting process on some match: Merge nodes, Remove Add and edges (and/or new or updated attributes).
 
     Args:
@@ -441,6 +576,7 @@ def _rewrite_match_expansive(input_graph: DiGraph, rule: Rule, p_input_map: dict
         rule (Rule): A rule that dictates what transformations should the graph go through
         p_input_map (dict[NodeName, NodeName]): Maps names of P nodes to names of input graph nodes, based on the match which we rewrite
         is_log (bool): If True, logs are printed throughout the process.
+        undo_log (_UndoLog, optional): If given, the inverse of every change is recorded in it. Defaults to None.
     """
         
     # Initialize an empty mapping from RHS nodes to input_graph nodes.
@@ -455,8 +591,8 @@ def _rewrite_match_expansive(input_graph: DiGraph, rule: Rule, p_input_map: dict
     merge_rhs_nodes = rule.nodes_to_merge().keys()
     for merge_rhs_node, p_merged in rule.nodes_to_merge().items():
         input_nodes_to_merge = {p_input_map[p_node] for p_node in p_merged}
-        new_merged_id = _merge_nodes(input_graph, input_nodes_to_merge, rule.merge_policy)
-        _log(f"Merge {input_nodes_to_merge} as {new_merged_id}", is_log)
+        new_merged_id = _merge_nodes(input_graph, input_nodes_to_merge, rule.merge_policy, undo_log)
+        _log(is_log, "merge", "Merge %s as %s", input_nodes_to_merge, new_merged_id)
         rhs_input_map[merge_rhs_node] = new_merged_id
         
     """Add nodes, complete RHS->input mapping with added (and preserved) nodes:
@@ -466,8 +602,8 @@ def _rewrite_match_expansive(input_graph: DiGraph, rule: Rule, p_input_map: dict
     """
     for rhs_node in rule.rhs.nodes():
         if rhs_node in rule.nodes_to_add():
-            added_id = _add_node(input_graph, rhs_node)
-            _log(f"Add node {rhs_node} as {added_id}", is_log)
+            added_id = _add_node(input_graph, rhs_node, undo_log)
+            _log(is_log, "add_node", "Add node %s as %s", rhs_node, added_id)
             rhs_input_map[rhs_node] = added_id
         elif rhs_node not in merge_rhs_nodes:
             p_node = list(rule._rev_p_rhs[rhs_node])[0]
@@ -475,20 +611,20 @@ def _rewrite_match_expansive(input_graph: DiGraph, rule: Rule, p_input_map: dict
 
     # Add edges.
     for rhs_src, rhs_target in rule.edges_to_add():
-        _log(f"Add edge ({rhs_input_map[rhs_src]}, {rhs_input_map[rhs_target]})", is_log)
-        _add_edge(input_graph, (rhs_input_map[rhs_src], rhs_input_map[rhs_target]))
+        _log(is_log, "add_edge", "Add edge (%s, %s)", rhs_input_map[rhs_src], rhs_input_map[rhs_target])
+        _add_edge(input_graph, (rhs_input_map[rhs_src], rhs_input_map[rhs_target]), undo_log)
 
     # Add node attrs.
     for rhs_node, attrs_to_add in rule.node_attrs_to_add().items():
-        _log(f"Added attrs {attrs_to_add} to node {rhs_input_map[rhs_node]}", is_log)
-        _add_node_attrs(input_graph, rhs_input_map[rhs_node], attrs_to_add)
+        _log(is_log, "add_node_attrs", "Added attrs %s to node %s", attrs_to_add, rhs_input_map[rhs_node])
+        _add_node_attrs(input_graph, rhs_input_map[rhs_node], attrs_to_add, undo_log)
 
     # Add edge attrs.
     for (rhs_src, rhs_target), attrs_to_add in rule.edge_attrs_to_add().items():
-        _log(f"Added attrs {attrs_to_add} to edge {(rhs_input_map[rhs_src], rhs_input_map[rhs_target])}", is_log)
-        _add_edge_attrs(input_graph, (rhs_input_map[rhs_src], rhs_input_map[rhs_target]), attrs_to_add)
+        _log(is_log, "add_edge_attrs", "Added attrs %s to edge %s", attrs_to_add, (rhs_input_map[rhs_src], rhs_input_map[rhs_target]))
+        _add_edge_attrs(input_graph, (rhs_input_map[rhs_src], rhs_input_map[rhs_target]), attrs_to_add, undo_log)
 
-# %% ../nbs/06_transform.ipynb 25
+# %% ../nbs/06_transform.ipynb 29
 def _copy_graph(graph: DiGraph) -> DiGraph:
     """Creates a copy of the graph (including attributes, which are deep-copied).
 
@@ -504,35 +640,67 @@ def _copy_graph(graph: DiGraph) -> DiGraph:
     copy_graph.update(nodes=copied_nodes, edges=copied_edges)
     return copy_graph
 
-# %% ../nbs/06_transform.ipynb 26
-def _restore_graph(graph: DiGraph, last_copy_graph: DiGraph):
-    """Change a graph according to some "checkpoint".
+# %% ../nbs/06_transform.ipynb 31
+def _compile_rule(lhs_graph: DiGraph, p_graph: DiGraph, rhs: str, merge_policy: MergePolicy, stats: RewriteStats = None) -> Tuple[Rule, DiGraph]:
+    """Construct the rule of a transformation once, for all of its matches.
 
     Args:
-        graph (DiGraph): A graph to change
-        last_copy_graph (DiGraph): The "checkpoint" to which the graph is restored
+        lhs_graph (DiGraph): A parsed LHS pattern
+        p_graph (DiGraph): A parsed P pattern
+        rhs (str): A RHS pattern string, with potential placeholders
+        merge_policy (MergePolicy): A policy that dictates how to merge conflicting attributes
+        stats (RewriteStats, optional): If given, parsing the RHS and constructing the rule are timed in it. Defaults to None.
+
+    Returns:
+        Tuple[Rule, DiGraph]: The rule, and the RHS template which should be rendered for each match (None if the RHS has no placeholders).
     """
-    graph.clear()
-    graph.update(nodes=last_copy_graph.nodes(data=True),
-                 edges=last_copy_graph.edges(data=True))
-
-# %% ../nbs/06_transform.ipynb 28
-def _rewrite_match(input_graph: DiGraph, match: Match,
-                   lhs_graph: DiGraph, p_graph: DiGraph, rhs: str,
-                   render_rhs: dict[str, RenderFunc],
-                   merge_policy: MergePolicy,
-                   is_log: bool) -> Match:
+    with _phase(stats, "parse"):
+        rhs_template = rhs_to_template(rhs) if rhs else None
+    with _phase(stats, "rule"):
+        rule = Rule(lhs_graph, p_graph, rhs_template, merge_policy=merge_policy)
+    if rhs_template is not None and (rhs_template.graph['node_placeholders'] or rhs_template.graph['edge_placeholders']):
+        # The structure of the rule doesn't depend on the placeholder values, so it's derived from the template itself
+        return rule, rhs_template
+    return rule, None
+
+class _CompiledRewrite(NamedTuple):
+    """Everything that is needed to rewrite a graph, which depends only on the patterns and the rewrite arguments.
+    It can be sent to worker processes, as long as the condition and the render functions can be pickled."""
+    lhs_graph: DiGraph
+    condition: FilterFunc
+    rule: Rule
+    rhs_template: DiGraph
+    render_rhs: dict[str, RenderFunc]
+
+def _compile_rewrite(lhs: str, p: str = None, rhs: str = None, condition: FilterFunc = None,
+                     render_rhs: dict[str, RenderFunc] = None, merge_policy: MergePolicy = None,
+                     stats: RewriteStats = None) -> _CompiledRewrite:
+    """Parse the patterns and compile the rule of a rewrite (see `rewrite_iter` for the arguments)."""
+    render_rhs = render_rhs if render_rhs else {}
+    merge_policy = merge_policy if merge_policy else MergePolicy.choose_last
+    with _phase(stats, "parse"):
+        lhs_graph, condition = lhs_to_graph(lhs, condition)
+        p_graph = p_to_graph(p) if p else None
+    rule, rhs_template = _compile_rule(lhs_graph, p_graph, rhs, merge_policy, stats)
+    return _CompiledRewrite(lhs_graph, condition, rule, rhs_template, render_rhs)
+
+# %% ../nbs/06_transform.ipynb 32
+def _rewrite_match(input_graph: DiGraph, match: Match, rule: Rule,
+                   rhs_template: DiGraph, render_rhs: dict[str, RenderFunc],
+                   is_log: bool, undo_log: _UndoLog = None, stats: RewriteStats = None) -> Match:
     """Perform a graph rewriting based on a single match.
 
     Args:
         input_graph (DiGraph): A graph to rewrite
         match (Match): A single match in the graph
-        lhs_graph (DiGraph): A parsed LHS pattern
-        p_graph (DiGraph): A parsed P pattern
-        rhs (str): A RHS pattern string, with potential placeholders
+        rule (Rule): The compiled rule (see `_compile_rule`)
+        rhs_template (DiGraph): A RHS template with placeholders, which is rendered for the match. None if the RHS has no placeholders.
         render_rhs (dict[str, RenderFunc]): Maps a RHS placeholder to a function that describes how to fill it, based on the given match
-        merge_policy (MergePolicy): A policy that dictates how to merge conflicting attributes
         is_log (bool): If True, logs are printed throughout the process.
+        undo_log (_UndoLog, optional): An undo log to record the changes in. If the rewriting fails, all the changes recorded in it
+            are rolled back (including changes recorded before this match). Defaults to a new undo log.
+        stats (RewriteStats, optional): If given, rendering the RHS, changing the graph and rolling back are timed and counted in it.
+            Defaults to None.
 
     Raises:
         GraphRewriteException: if something went wrong during the rewriting process
@@ -541,35 +709,151 @@ def _rewrite_match(input_graph: DiGraph, match: Match,
         Match: The match the we've just rewritten
     """
 
-    _log(f"Transform match: {match.mapping}", is_log, _GREEN)
-    # Save graph in current state for restoring, if needed
-    saved_graph = _copy_graph(input_graph)
+    _log(is_log, "match", "Transform match: %s", match.mapping, color=_GREEN)
+    # Record every change made to the graph, for restoring if needed
+    undo_log = undo_log if undo_log is not None else _UndoLog()
 
     try:
-        # Parse RHS according to current match (with render dictionary)
-        rhs_graph = rhs_to_graph(rhs, match, render_rhs) if rhs else None
-        rule = Rule(lhs_graph, p_graph, rhs_graph, merge_policy=merge_policy)
+        # Render the RHS placeholders according to current match (with render dictionary)
+        if rhs_template is not None:
+            with _phase(stats, "render"):
+                rendered_rhs = render_rhs_template(rhs_template, match, render_rhs)
+            with _phase(stats, "rule"):
+                rule = rule._with_rhs(rendered_rhs)
         # Transform the graph
-        lhs_input_map = match.mapping
-        p_input_map = _rewrite_match_restrictive(input_graph, rule, lhs_input_map, is_log)
-        _rewrite_match_expansive(input_graph, rule, p_input_map, is_log)
-        _log(f"Nodes: {input_graph.nodes(data=True)}\nEdges: {input_graph.edges(data=True)}\n", is_log, _GREEN)
+        with _phase(stats, "mutation"):
+            lhs_input_map = match.mapping
+            p_input_map = _rewrite_match_restrictive(input_graph, rule, lhs_input_map, is_log, undo_log)
+            _rewrite_match_expansive(input_graph, rule, p_input_map, is_log, undo_log)
+        _log(is_log, "graph", "Nodes: %s\nEdges: %s\n", input_graph.nodes(data=True), input_graph.edges(data=True), color=_GREEN)
+        if stats is not None:
+            stats.count("rewrites")
         return match
 
     except GraphRewriteException as e:
-        _log(f"Failed to transform: {e.message}", is_log, _RED)
-        _restore_graph(input_graph, saved_graph)
+        _log(is_log, "failure", "Failed to transform: %s", e.message, color=_RED)
+        with _phase(stats, "rollback"):
+            undo_log.rollback()
+        if stats is not None:
+            stats.count("rollbacks")
         raise e
 
-# %% ../nbs/06_transform.ipynb 30
+# %% ../nbs/06_transform.ipynb 34
+def _rewrite_compiled(input_graph: DiGraph, compiled: _CompiledRewrite,
+                      is_log: bool = False,
+                      is_recursive: bool = False,
+                      is_parallel: bool = False,
+                      workers: int = None,
+                      display_matches: bool = False,
+                      stats: RewriteStats = None,
+                      compact: bool = False,
+                      index: AttributeIndex = None,
+                      graph_stats: GraphStatistics = None) -> Iterator[Match]:
+    """Perform a graph rewriting with a compiled rewrite, yielding the matches one by one after rewriting
+    (see `rewrite_iter` for the arguments)."""
+    lhs_graph, condition, rule, rhs_template, render_rhs = compiled
+    if index is not None and index.graph is not input_graph:
+        raise GraphRewriteException("The attribute index belongs to another graph")
+    if is_recursive and is_parallel:
+        raise GraphRewriteException("A rewrite can't be both recursive and parallel")
+
+    if is_recursive and _checks_constraints_only(lhs_graph, condition):
+        # Keep the matches up to date after each rewrite, by searching again only around the nodes it touched.
+        # A match depends only on its own nodes and edges, unless a user condition looks elsewhere in the graph
+        match_pool = _MatchPool(input_graph, lhs_graph, condition=condition, workers=workers, stats=stats, compact=compact,
+                                index=index, graph_stats=graph_stats)
+        while True:
+            next_match = match_pool.first()
+            if next_match is None:
+                break
+            if display_matches:
+                draw_match(input_graph, next_match)
+            yield next_match
+            undo_log = _UndoLog()
+            new_res = _rewrite_match(input_graph, next_match, rule, rhs_template, render_rhs, is_log, undo_log, stats)
+            if index is not None:
+                index.refresh(undo_log.touched_nodes)
+            match_pool.update(undo_log.touched_nodes)
+
+        _log(is_log, "done", "No more matches.", color=_GREEN)
+
+    elif is_recursive:
+        # A user condition might depend on any part of the graph, so the whole graph is searched again after each rewrite.
+        # Only the initial search is split between workers, since each search in workers starts a pool and sends it the graph
+        search_workers = workers
+        while True:
+            next_match = next(find_matches(input_graph, lhs_graph, condition=condition, workers=search_workers, stats=stats, compact=compact,
+                                           index=index, graph_stats=graph_stats), None)
+            search_workers = None
+            if next_match is None:
+                break
+            if display_matches:
+                draw_match(input_graph, next_match)
+            yield next_match
+            undo_log = _UndoLog()
+            new_res = _rewrite_match(input_graph, next_match, rule, rhs_template, render_rhs, is_log, undo_log, stats)
+            if index is not None:
+                index.refresh(undo_log.touched_nodes)
+
+        _log(is_log, "done", "No more matches.", color=_GREEN)
+
+    elif is_parallel:
+        while True:
+            # The matches of a pass are selected before the graph is changed, so no copy of the graph is needed
+            matches = _disjoint_matches(input_graph, lhs_graph, condition=condition, workers=workers, stats=stats, compact=compact,
+                                        index=index, graph_stats=graph_stats)
+            if len(matches) == 0:
+                break
+            # A single undo log for the whole pass, so a failure rolls back all of its rewrites
+            undo_log = _UndoLog()
+            for match in matches:
+                if display_matches:
+                    draw_match(input_graph, match)
+                yield match
+                new_res = _rewrite_match(input_graph, match, rule, rhs_template, render_rhs, is_log, undo_log, stats)
+            if index is not None:
+                index.refresh(undo_log.touched_nodes)
+
+        _log(is_log, "done", "No more matches.", color=_GREEN)
+
+    else:
+        # Create a duplication of the graph to find matches lazily (actual graph changes between matches)
+        copy_input_graph = _copy_graph(input_graph)
+
+        # The copy is searched with the index as is, so it's refreshed only once the matches of the copy are exhausted
+        touched_nodes = set()
+        try:
+            # Find matches lazily and transform
+            for match in find_matches(copy_input_graph, lhs_graph, condition=condition, workers=workers, stats=stats, compact=compact,
+                                      index=index, graph_stats=graph_stats):
+                if display_matches:
+                    draw_match(input_graph, match)
+                # the match object points to the copy graph, so we need to move it to the original graph for imperative changes
+                match.set_graph(input_graph)
+                yield match
+                undo_log = _UndoLog()
+                try:
+                    new_res = _rewrite_match(input_graph, match, rule, rhs_template, render_rhs, is_log, undo_log, stats)
+                finally:
+                    touched_nodes.update(undo_log.touched_nodes)
+        finally:
+            if index is not None:
+                index.refresh(touched_nodes)
+
+# %% ../nbs/06_transform.ipynb 35
 def rewrite_iter(input_graph: DiGraph, lhs: str, p: str = None, rhs: str = None,
                    condition: FilterFunc = None,
                    render_rhs: dict[str, RenderFunc] = None,
                    merge_policy: MergePolicy = None,
                    is_log: bool = False,
                    is_recursive: bool = False,
+                   is_parallel: bool = False,
+                   workers: int = None,
                    display_matches: bool = False,
-                   
+                   stats: RewriteStats = None,
+                   compact: bool = False,
+                   index: AttributeIndex = None,
+                   graph_stats: GraphStatistics = None,
                    ) -> List[Match]:
     """Perform a graph rewriting using a lazy iterator, yielding the matches one by one after rewriting
 
@@ -582,70 +866,237 @@ def rewrite_iter(input_graph: DiGraph, lhs: str, p: str = None, rhs: str = None,
         render_rhs (dict[str, RenderFunc], optional): Maps a RHS placeholder to a function that describes how to fill it, based on the given match. Defaults to {}.
         merge_policy (MergePolicy, optional): A policy that dictates how to merge conflicting attributes. Defaults to MergePolicy.choose_last.
         is_log (bool, optional): If True, logs are printed throughout the process. Defaults to False.
-        is_recursive (bool, optional): If True, matches pool is updated after each rewrite (as that pool might change). Defaults to False.
+        is_recursive (bool, optional): If True, matches pool is updated after each rewrite (as that pool might change). Without a user
+            condition, the pool is updated by searching only around the nodes that the rewrite touched, and the next match rewritten is
+            the earliest one found that still holds (rather than the first match of a new search, so rules whose result depends on the
+            order of the matches might give a different result than in earlier versions). With a user condition, the whole graph is
+            searched again after every rewrite. Defaults to False.
+        is_parallel (bool, optional): If True, the graph is rewritten in passes until no matches are left. Each pass rewrites
+            a maximal set of node-disjoint matches, which are all selected before the graph is changed. They are still rewritten one
+            by one, but with a single undo log, so the pass is rolled back as a whole if one of its rewrites fails. Can't be combined
+            with is_recursive. Defaults to False.
+        workers (int, optional): If given, the search for matches is split between this number of worker processes
+            (in recursive mode, only the initial search). The matches are the same as those of a serial search. Defaults to None.
         display_matches (bool, optional): If True, the matches are displayed, useful for debugging. Defaults to False.
+        stats (RewriteStats, optional): If given, the time of each phase of the rewrite and counters of its events are collected in it.
+            Defaults to None.
+        compact (bool, optional): If True, searches which cover the whole graph (in recursive mode without a user condition, only the initial one) run over
+            a compact snapshot of the graph, which is faster on large graphs. The matches are the same, but might be found in a different
+            order. Defaults to False.
+        index (AttributeIndex, optional): An attribute index of the input graph, which the searches take their candidates from
+            (unless they run over a compact snapshot or in worker processes). It's refreshed with the nodes touched by the rewrites,
+            so it can be kept for later rewrites of the graph. Defaults to None.
+        graph_stats (GraphStatistics, optional): Statistics of the input graph, from which the order of the searches is planned
+            (see `plan_matching`). They aren't updated by the rewrites, which is fine as long as the graph doesn't change much. Defaults to None.
 
     Yields:
         Iterator[Match]: An iterator of Match instances, which denote the matches we've transformed.
     """
-    condition = condition if condition else lambda match: True
-    render_rhs = render_rhs if render_rhs else {}
-    merge_policy = merge_policy if merge_policy else MergePolicy.choose_last
-
-    _log(f"Nodes: {input_graph.nodes(data=True)}\nEdges: {input_graph.edges(data=True)}\n", is_log, _GREEN)
-
-    # Parse LHS and P (global for all matches)
-    lhs_graph, condition = lhs_to_graph(lhs, condition)
-    p_graph = p_to_graph(p) if p else None
-    
-    if is_recursive:
-        while True:
-            try:
-                next_match = next(find_matches(input_graph, lhs_graph, condition=condition))
-                if display_matches:
-                    draw_match(input_graph, next_match)
-                yield next_match
-                new_res = _rewrite_match(input_graph, next_match, lhs_graph, p_graph, rhs, render_rhs, merge_policy, is_log)
-            except StopIteration:
-                break
-
-        _log("No more matches.", is_log, _GREEN)
+    _log(is_log, "graph", "Nodes: %s\nEdges: %s\n", input_graph.nodes(data=True), input_graph.edges(data=True), color=_GREEN)
+
+    # Parse LHS and P, and compile the rule (global for all matches)
+    compiled = _compile_rewrite(lhs, p, rhs, condition, render_rhs, merge_policy, stats)
+    yield from _rewrite_compiled(input_graph, compiled, is_log, is_recursive, is_parallel, workers, display_matches, stats, compact,
+                                  index, graph_stats)
+
+# %% ../nbs/06_transform.ipynb 37
+_shard_rewrite = None # The input graph and the rewrite arguments, in a worker process
+
+def _init_shard_worker(input_graph: DiGraph, lhs: str, kwargs: dict, collect_stats: bool):
+    global _shard_rewrite
+    _shard_rewrite = (input_graph, lhs, kwargs, collect_stats)
+
+def _rewrite_components(components: list[list[NodeName]]) -> Tuple[list[DiGraph], Optional[RewriteStats]]:
+    input_graph, lhs, kwargs, collect_stats = _shard_rewrite
+    stats = RewriteStats() if collect_stats else None
+    rewritten = []
+    for component in components:
+        component_graph = input_graph.subgraph(component).copy()
+        for _ in rewrite_iter(component_graph, lhs, stats=stats, **kwargs):
+            pass
+        rewritten.append(component_graph)
+    return rewritten, stats
+
+def _stitch_components(input_graph: DiGraph, components: list[list[NodeName]], rewritten: list[DiGraph]) -> set[NodeName]:
+    """Replace the components of the input graph which were changed with their rewritten versions (the others are left as they are,
+    in their place in the graph). Nodes which were added to a component are renamed if their name is already taken by another component.
 
-    else:
-        # Create a duplication of the graph to find matches lazily (actual graph changes between matches)
-        copy_input_graph = _copy_graph(input_graph)
-
-        # Find matches lazily and transform
-        for match in find_matches(copy_input_graph, lhs_graph, condition=condition):
-            if display_matches:
-                draw_match(input_graph, match)
-            # the match object points to the copy graph, so we need to move it to the original graph for imperative changes
-            match.set_graph(input_graph)
-            yield match
-            new_res = _rewrite_match(input_graph, match, lhs_graph, p_graph, rhs, render_rhs, merge_policy, is_log)
+    Args:
+        input_graph (DiGraph): The input graph
+        components (list[list[NodeName]]): The nodes of each component, before rewriting
+        rewritten (list[DiGraph]): The rewritten graph of each component
 
+    Returns:
+        set[NodeName]: The nodes of the replaced components, before and after rewriting
+    """
+    changed = []
+    for component, component_graph in zip(components, rewritten):
+        original_graph = input_graph.subgraph(component)
+        if not (_graphs_equal(original_graph, component_graph) and _graphs_equal(component_graph, original_graph)):
+            changed.append((component, component_graph))
+    if len(changed) == 0:
+        return set()
+    components, rewritten = zip(*changed)
+
+    touched_nodes = set(itertools.chain.from_iterable(components))
+    for component in components:
+        input_graph.remove_nodes_from(component)
+    # First, the original nodes which were kept (their names are unique, as they come from a single graph)
+    for component, component_graph in zip(components, rewritten):
+        component_nodes = set(component)
+        input_graph.add_nodes_from((node, attrs) for node, attrs in component_graph.nodes(data=True) if node in component_nodes)
+    # Then, the added nodes (e.g. clones), which might collide with nodes of other components
+    for component, component_graph in zip(components, rewritten):
+        component_nodes = set(component)
+        names = {node: node for node in component_nodes}
+        for node, attrs in component_graph.nodes(data=True):
+            if node not in component_nodes:
+                names[node] = _generate_new_node_name(input_graph, node)
+                input_graph.add_node(names[node], **attrs)
+        input_graph.add_edges_from((names[s], names[t], attrs) for s, t, attrs in component_graph.edges(data=True))
+        touched_nodes.update(names.values())
+    return touched_nodes
+
+def _rewrite_sharded(input_graph: DiGraph, lhs: str, workers: int = None, **kwargs):
+    """Rewrite each weakly connected component of the input graph separately, in a pool of worker processes,
+    and put the rewritten components back in the input graph.
 
-# %% ../nbs/06_transform.ipynb 31
+    Args:
+        input_graph (DiGraph): A graph to rewrite
+        lhs (str): A LHS pattern string, which should be (weakly) connected
+        workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+        kwargs: Other arguments of `rewrite_iter`
+    """
+    # The stats of every batch are collected by its worker, and added to the given stats
+    stats = kwargs.pop('stats', None)
+    index = kwargs.pop('index', None)
+    components = [list(component) for component in nx.weakly_connected_components(input_graph)]
+    # A few batches of components per worker, so each task is large enough to be worth sending
+    workers = workers if workers else os.cpu_count()
+    batch_size = max(1, math.ceil(len(components) / (workers * 4)))
+    batches = [components[i:i + batch_size] for i in range(0, len(components), batch_size)]
+
+    rewritten = []
+    with ProcessPoolExecutor(workers, initializer=_init_shard_worker, initargs=(input_graph, lhs, kwargs, stats is not None)) as executor:
+        for batch, batch_stats in executor.map(_rewrite_components, batches):
+            rewritten.extend(batch)
+            if stats is not None:
+                stats.merge(batch_stats)
+    touched_nodes = _stitch_components(input_graph, components, rewritten)
+    if index is not None:
+        # The old and new nodes of the changed components are indexed again
+        index.refresh(touched_nodes)
+
+# %% ../nbs/06_transform.ipynb 38
 @delegates(rewrite_iter)
-def rewrite(input_graph: DiGraph, lhs: str,**kwargs
+def rewrite(input_graph: DiGraph, lhs: str, is_sharded: bool = False, **kwargs
                    ) -> List[Match]:
     """Perform a graph rewriting.
 
     Args:
         input_graph (DiGraph): A graph to rewrite
         lhs (str): A LHS pattern string
+        is_sharded (bool, optional): If True, each weakly connected component of the input graph is rewritten separately,
+            by a pool of `workers` processes. This applies only to (weakly) connected LHS patterns, and assumes that conditions
+            and render functions depend only on the match. Defaults to False.
         p (str, optional): A P pattern string. Defaults to None.
         rhs (str, optional): A RHS pattern string. Defaults to None.
         condition (FilterFunc, optional): A condition on the matches. Matches for which the condition doesn't hold aren't rewritten. Defaults to lambda match: True.
         render_rhs (dict[str, RenderFunc], optional): Maps a RHS placeholder to a function that describes how to fill it, based on the given match. Defaults to {}.
         merge_policy (MergePolicy, optional): A policy that dictates how to merge conflicting attributes. Defaults to MergePolicy.choose_last.
         is_log (bool, optional): If True, logs are printed throughout the process. Defaults to False.
-        is_recursive (bool, optional): If True, matches pool is updated after each rewrite (as that pool might change). Defaults to False.
+        is_recursive (bool, optional): If True, matches pool is updated after each rewrite (as that pool might change). Without a user
+            condition, the pool is updated by searching only around the nodes that the rewrite touched, and the next match rewritten is
+            the earliest one found that still holds (rather than the first match of a new search, so rules whose result depends on the
+            order of the matches might give a different result than in earlier versions). With a user condition, the whole graph is
+            searched again after every rewrite. Defaults to False.
+        is_parallel (bool, optional): If True, the graph is rewritten in passes until no matches are left. Each pass rewrites
+            a maximal set of node-disjoint matches, which are all selected before the graph is changed. They are still rewritten one
+            by one, but with a single undo log, so the pass is rolled back as a whole if one of its rewrites fails. Can't be combined
+            with is_recursive. Defaults to False.
+        workers (int, optional): If given, the search for matches is split between this number of worker processes
+            (in recursive mode, only the initial search). The matches are the same as those of a serial search. Defaults to None.
         display_matches (bool, optional): If True, the matches are displayed, useful for debugging. Defaults to False.
+        stats (RewriteStats, optional): If given, the time of each phase of the rewrite and counters of its events are collected in it
+            (in sharded rewrites, those of the worker processes are added up). Defaults to None.
+        compact (bool, optional): If True, searches which cover the whole graph (in recursive mode without a user condition, only the initial one) run over
+            a compact snapshot of the graph, which is faster on large graphs. The matches are the same, but might be found in a different
+            order. Defaults to False.
+        index (AttributeIndex, optional): An attribute index of the input graph, which the searches take their candidates from.
+            It's refreshed with the nodes touched by the rewrites. Defaults to None.
+        graph_stats (GraphStatistics, optional): Statistics of the input graph, from which the order of the searches is planned. Defaults to None.
 
     Returns:
         Nothing, the graph is transformed in place.
     """
+    if is_sharded:
+        lhs_graph, _ = lhs_to_graph(lhs)
+        if len(lhs_graph.nodes) > 0 and nx.is_weakly_connected(lhs_graph):
+            return _rewrite_sharded(input_graph, lhs, **kwargs)
     for _ in rewrite_iter(input_graph, lhs, **kwargs):
         pass
 
+# %% ../nbs/06_transform.ipynb 40
+_many_rewrite = None # The compiled rewrite and its options, in a worker process
+
+def _init_many_worker(compiled: _CompiledRewrite, options: dict):
+    global _many_rewrite
+    _many_rewrite = (compiled, options)
+
+def _rewrite_chunk(graphs: list[DiGraph]) -> list[DiGraph]:
+    compiled, options = _many_rewrite
+    for graph in graphs:
+        for _ in _rewrite_compiled(graph, compiled, **options):
+            pass
+    return graphs
+
+def rewrite_many(graphs: Iterable[DiGraph], lhs: str, p: str = None, rhs: str = None,
+                 condition: FilterFunc = None,
+                 render_rhs: dict[str, RenderFunc] = None,
+                 merge_policy: MergePolicy = None,
+                 is_log: bool = False,
+                 is_recursive: bool = False,
+                 is_parallel: bool = False,
+                 workers: int = None,
+                 chunksize: int = 64) -> Iterator[DiGraph]:
+    """Apply the same rewrite to many graphs. The patterns are parsed and the rule is compiled once, for all the graphs.
+
+    Args:
+        graphs (Iterable[DiGraph]): The graphs to rewrite. They are consumed lazily, a few chunks at a time.
+        lhs (str): A LHS pattern string
+        p (str, optional): A P pattern string. Defaults to None.
+        rhs (str, optional): A RHS pattern string. Defaults to None.
+        condition (FilterFunc, optional): A condition on the matches. Defaults to lambda match: True.
+        render_rhs (dict[str, RenderFunc], optional): Maps a RHS placeholder to a function that describes how to fill it. Defaults to {}.
+        merge_policy (MergePolicy, optional): A policy that dictates how to merge conflicting attributes. Defaults to MergePolicy.choose_last.
+        is_log (bool, optional): If True, logs are printed throughout the process. Defaults to False.
+        is_recursive (bool, optional): Rewrite each graph recursively (see `rewrite_iter`). Defaults to False.
+        is_parallel (bool, optional): Rewrite each graph in passes of node-disjoint matches (see `rewrite_iter`). Defaults to False.
+        workers (int, optional): If given, the graphs are rewritten by this number of worker processes, which receive the compiled
+            rewrite once (so the condition and the render functions should be picklable, unless the processes are forked).
+            Otherwise, the graphs are rewritten in place, in this process. Defaults to None.
+        chunksize (int, optional): The number of graphs sent to a worker process at a time. At most two chunks per worker
+            are in flight, which bounds the memory use. Defaults to 64.
+
+    Yields:
+        Iterator[DiGraph]: The rewritten graphs, in the order of the input graphs. With workers, these are rewritten copies of the input graphs.
+    """
+    compiled = _compile_rewrite(lhs, p, rhs, condition, render_rhs, merge_policy)
+    options = dict(is_log=is_log, is_recursive=is_recursive, is_parallel=is_parallel)
+    if not workers:
+        for graph in graphs:
+            for _ in _rewrite_compiled(graph, compiled, **options):
+                pass
+            yield graph
+        return
+
+    graphs = iter(graphs)
+    chunks = iter(lambda: list(itertools.islice(graphs, chunksize)), [])
+    with ProcessPoolExecutor(workers, initializer=_init_many_worker, initargs=(compiled, options)) as executor:
+        # Keep a bounded window of chunks in flight, and yield the results in order
+        in_flight = deque(executor.submit(_rewrite_chunk, chunk) for chunk in itertools.islice(chunks, workers * 2))
+        while in_flight:
+            rewritten = in_flight.popleft().result()
+            for chunk in itertools.islice(chunks, 1):
+                in_flight.append(executor.submit(_rewrite_chunk, chunk))
+            yield from rewritten